@@ -8,11 +8,12 @@ class Block:
     prevBlockHash: Previous/Parent Block Hash
     isGenesis: Boolean value stating whether this block is genesis block or not
     transactions: Set of transactions under this block (0th index stating coinbase)
+    size: Size of the block in KBs (1 KB per transaction, or a synthetic size in block only mode, see BlockSizes)
     blockHash: Unique Identifier for each Block
     depth: Depth of the block in the blockchain (Number of blocks in the chain before this block since genesis block (included))
 
     '''
-    def __init__(self, timestamp, previousBlock, isGenesis, transactions) :
+    def __init__(self, timestamp, previousBlock, isGenesis, transactions, size=None) :
         self.timestamp = timestamp
         self.previousBlock = previousBlock
         if not isGenesis:
@@ -22,10 +23,51 @@ class Block:
             self.depth = 0
         self.isGenesis = isGenesis
         self.transactions = transactions
+        self.size = len(transactions) if size is None else size
         self.blockHash = self.calculateBlockHash()
     
     def calculateBlockHash(self):
         txnStrings = ''.join(transaction.TXNString for transaction in self.transactions)
         blockData = str(self.timestamp) + txnStrings + ('' if self.isGenesis else self.prevBlockHash)
         blockHash = hashlib.sha256(blockData.encode('utf-8'))
-        return blockHash.hexdigest()
\ No newline at end of file
+        return blockHash.hexdigest()
+
+# Distribution of the synthetic block sizes (KBs) of the block only mode, given as "uniform:A:B", "exponential:MEAN" or "fixed:K"
+class BlockSizes:
+    '''
+    kind: Kind of distribution, possible kinds: {"uniform" (integer sizes from A to B KBs), "exponential" (mean MEAN KBs), "fixed" (K KBs)}
+    parameters: Parameters of the distribution (floats)
+    rng: Random number generator the sizes are drawn from
+
+    '''
+    # Number of parameters of each kind of distribution
+    kinds = { "uniform": 2, "exponential": 1, "fixed": 1 }
+
+    def __init__(self, distribution, rng):
+        usage = "Unknown block size distribution " + distribution + ", available distributions: uniform:A:B, exponential:MEAN, fixed:K"
+        kind, *parameters = distribution.split(":")
+        if kind not in self.kinds or len(parameters) != self.kinds[kind]:
+            raise ValueError(usage)
+        try:
+            self.parameters = [float(parameter) for parameter in parameters]
+        except ValueError:
+            raise ValueError(usage)
+
+        # Sizes are never negative: 0 <= A <= B, MEAN > 0 and K >= 0 (written so that NaN parameters are rejected too)
+        if kind == "uniform" and not (0 <= self.parameters[0] <= self.parameters[1]):
+            raise ValueError(usage)
+        if kind == "exponential" and not (self.parameters[0] > 0):
+            raise ValueError(usage)
+        if kind == "fixed" and not (self.parameters[0] >= 0):
+            raise ValueError(usage)
+
+        self.kind = kind
+        self.rng = rng
+
+    # Size of the next block
+    def draw(self):
+        if self.kind == "uniform":
+            return int(self.rng.integers(int(self.parameters[0]), int(self.parameters[1]) + 1))
+        if self.kind == "exponential":
+            return self.rng.exponential(self.parameters[0])
+        return self.parameters[0]
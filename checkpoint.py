@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+from block import Block
+from node import Node
+from attack import AttackNode
+import gzip
+import io
+import os
+import pickle
+import time
+
+'''
+Checkpoint file layout (gzip compressed pickle stream):
+	1. Block table: list of block attributes sorted by depth, parent block given by its hash
+	2. Node table: list of (class, node attributes), peers given by their NodeIDs
+	3. Simulation state: dictionary where every Block and Node object is replaced by a reference into the tables above
+
+Blocks point to their parent and nodes point to their peers, pickling them directly recurses along the whole chain / peer graph.
+Storing them as flat tables keeps the recursion depth constant whatever the length of the chain or the size of the network.
+'''
+
+# Pickler replacing Block and Node objects by references into the tables
+class CheckpointPickler(pickle.Pickler):
+	def persistent_id(self, obj):
+		if isinstance(obj, Block):
+			return ("block", obj.blockHash)
+		if isinstance(obj, (Node, AttackNode)):
+			return ("node", obj.nodeID)
+		return None
+
+# Unpickler resolving references into the tables
+class CheckpointUnpickler(pickle.Unpickler):
+	def __init__(self, file):
+		super().__init__(file)
+		self.blocks = dict()
+		self.nodes = dict()
+
+	def persistent_load(self, pid):
+		kind, key = pid
+		return self.blocks[key] if kind == "block" else self.nodes[key]
+
+# Collect every block reachable from the nodes and the given events (with their ancestors)
+def collect_blocks(nodeArray, events=()):
+	blocks = dict()
+
+	def add_chain(block):
+		while block is not None and block.blockHash not in blocks:
+			blocks[block.blockHash] = block
+			block = block.previousBlock
+
+	# Events kept by the nodes as cancellation handles (the block of a failed broadcast is in no block tree)
+	events = list(events)
+
+	for node in nodeArray:
+		tree = node.blocksSeen if node.role == "honest" else node.blocksTree
+		for blockInfo in tree.values():
+			add_chain(blockInfo["Block"])
+		if node.role == "honest":
+			if node.futureBroadCastEvent is not None:
+				events.append(node.futureBroadCastEvent)
+		else:
+			for privateBlock in node.privateChain:
+				add_chain(privateBlock[1])
+			add_chain(node.lastBlock)
+			events.extend(node.futureEvents)
+
+	for currEvent in events:
+		if isinstance(currEvent.eventObject, Block):
+			add_chain(currEvent.eventObject)
+
+	return sorted(blocks.values(), key=lambda block: block.depth)
+
+# Attributes of a block, parent block given by its hash
+def block_state(block):
+	blockState = dict(vars(block))
+	blockState["previousBlock"] = None if block.previousBlock is None else block.previousBlock.blockHash
+	return blockState
+
+# Rebuild a block from its attributes (without recomputing the hash), its parent is looked up in blocks = { BlockHash : Block Object, ... }
+def restore_block(blockState, blocks):
+	block = Block.__new__(Block)
+	vars(block).update(blockState)
+	block.previousBlock = None if blockState["previousBlock"] is None else blocks[blockState["previousBlock"]]
+	return block
+
+# Write the block table and node table of the nodes (and of the blocks of the given events)
+def dump_tables(pickler, nodes, events=()):
+	pickler.dump([block_state(block) for block in collect_blocks(nodes, events)])
+
+	nodeTable = []
+	for node in nodes:
+		nodeState = dict(vars(node))
+		nodeState["peers"] = { peerID : [peerID, peer[1], peer[2]] for peerID, peer in node.peers.items() }
+		# Callbacks of the observers belong to the running process
+		nodeState["observers"] = None
+		nodeTable.append((type(node), nodeState))
+	pickler.dump(nodeTable)
+
+# Read the block table and node table written by dump_tables, peers are left as NodeIDs (see link_peers)
+def load_tables(unpickler):
+	# Rebuilding the blocks in order of depth (parents first)
+	for blockState in unpickler.load():
+		block = restore_block(blockState, unpickler.blocks)
+		unpickler.blocks[block.blockHash] = block
+
+	for nodeClass, nodeState in unpickler.load():
+		node = nodeClass.__new__(nodeClass)
+		vars(node).update(nodeState)
+		unpickler.nodes[node.nodeID] = node
+
+# Replace the NodeIDs of the peers by the Node objects, nodes = { NodeID : Node Object, ... }
+def link_peers(nodes):
+	for node in nodes.values():
+		for peer in node.peers.values():
+			peer[0] = nodes[peer[0]]
+
+# Serialize some nodes (with their block trees) to bytes
+def dump_nodes(nodes):
+	buffer = io.BytesIO()
+	dump_tables(CheckpointPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL), nodes)
+	return buffer.getvalue()
+
+# Rebuild the node array from the bytes given by dump_nodes for disjoint sets of nodes covering the network
+def load_nodes(dumps):
+	nodes = dict()
+	for data in dumps:
+		unpickler = CheckpointUnpickler(io.BytesIO(data))
+		load_tables(unpickler)
+		nodes.update(unpickler.nodes)
+
+	link_peers(nodes)
+	return [nodes[nodeID] for nodeID in sorted(nodes)]
+
+# Serialize the simulation state (nodes, event queue and the state dictionary) to bytes, also used for in-memory snapshots
+def dump_simulation(nodeArray, eventQueue, state):
+	simulationState = dict(state)
+	simulationState["nodeArray"] = nodeArray
+	simulationState["eventQueue"] = eventQueue
+
+	buffer = io.BytesIO()
+	pickler = CheckpointPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+	dump_tables(pickler, nodeArray, (entry[2] for entry in eventQueue.entries()))
+	pickler.dump(simulationState)
+	return buffer.getvalue()
+
+# Rebuild the simulation state from the bytes given by dump_simulation (new objects every time, so a snapshot can be loaded many times)
+def load_simulation(data):
+	unpickler = CheckpointUnpickler(io.BytesIO(data))
+
+	# Rebuilding the blocks and the nodes, then linking the peers
+	load_tables(unpickler)
+	link_peers(unpickler.nodes)
+
+	return unpickler.load()
+
+# Save the simulation state in a checkpoint file (written atomically)
+def save_checkpoint(filename, nodeArray, eventQueue, state):
+	temporaryFilename = filename + ".tmp"
+	with gzip.open(temporaryFilename, "wb", compresslevel=1) as f:
+		f.write(dump_simulation(nodeArray, eventQueue, state))
+	os.replace(temporaryFilename, filename)
+
+# Load the simulation state from a checkpoint file
+def load_checkpoint(filename):
+	with gzip.open(filename, "rb") as f:
+		return load_simulation(f.read())
+
+# Decides when a periodic checkpoint is due
+class Checkpointer:
+	'''
+	filename: Name of the checkpoint file (None disables checkpointing)
+	everyEvents: A checkpoint is written every these many events (None if not used)
+	interval: A checkpoint is written every these many seconds of wall clock time (None if not used)
+	lastCheckpointTime: Wall clock time of the last checkpoint
+
+	'''
+	# Wall clock is checked once every these many events (must be a power of 2)
+	timeCheckInterval = 4096
+
+	def __init__(self, filename=None, everyEvents=None, interval=None):
+		self.filename = filename
+		self.everyEvents = everyEvents
+		self.interval = interval
+		self.lastCheckpointTime = time.time()
+
+	# Boolean value stating whether a checkpoint file is configured
+	@property
+	def enabled(self):
+		return self.filename is not None
+
+	# Check if a checkpoint is due after cnt events
+	def due(self, cnt):
+		if self.everyEvents is not None and cnt % self.everyEvents == 0:
+			return True
+		return self.interval is not None and not cnt & (self.timeCheckInterval - 1) and time.time() - self.lastCheckpointTime >= self.interval
+
+	# Write a checkpoint of the simulation
+	def save(self, nodeArray, eventQueue, state):
+		save_checkpoint(self.filename, nodeArray, eventQueue, state)
+		self.lastCheckpointTime = time.time()
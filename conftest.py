@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+from simulator import SimulationConfig
+import pytest
+
+'''
+Fixtures shared by the tests (python3 -m pytest -q): short seeded simulations without output
+'''
+
+# Configuration of a short seeded simulation (20 simulated seconds, about 15000 events), without terminal output or report files
+@pytest.fixture
+def config():
+	return SimulationConfig(nodes=12, zeta_1=0.3, zeta_2=0.2, T_Tx=800, I=500, maxEventLoop=30000, stopTime=20000, seed=3, trace="off", noReport=True)
+
+# Summary of a run without the wall clock time (the only field that changes between identical runs)
+@pytest.fixture
+def summary():
+	def summary_of(result):
+		values = result.summary()
+		values.pop("wallTime")
+		return values
+	return summary_of
@@ -1,99 +1,144 @@
 #!/usr/bin/env python3
 from transactions import TXN
 from block import Block
-import random
-import secrets
+from mining import MiningRace
+from observers import chain_tip, reorg_depth
 
 # Event class
 class Event:
     '''
-    eventID: Unique Identifier for each Event
     timestamp: TimeStamp of the Event
     createdBy: The event is triggered by a parent event. Who executed the parent event (NodeID)?
     executedBy: The event needs to be executed by which node (nodeID)
-    eventObject: Class Object which might be processed by this event
+    eventObject: Class Object which might be processed by this event (random number generator of the genesis block for genesis event)
+    pending: Boolean value stating whether the event is waiting in the event queue
+    cancelled: Boolean value stating whether the event was cancelled (skipped when popped from the event queue)
     eventType: Type of event, possible types: 
         "genesis block creation" --> ("genesis")
         "create transaction at node i" --> ("create", "TXN")
         "receive transaction at node i" --> ("receive", "TXN")
-        "create block at node i" --> ("create", "block")
+        "create block at node i" --> ("create", "block") (only scheduled by the genesis event, afterwards mining starts within the block events, see start_mining)
         "broadcast block at node i" -->  ("broadcast", "block")
         "receive block at node i" --> ("receive", "block")
+        "create a batch of transactions at node i" --> ("create", "TXNs") (batched transaction generation, instead of ("create", "TXN"))
+        "receive a batch of transactions at node i" --> ("receive", "TXNs")
     Now, as attackers are present, the events will change as these:
         "create transaction at attacker node i" --> ("create", "TXN")
         "receive transaction at attacker node i" --> ("receive", "TXN")
         "create block at attacker node i" --> ("create", "block")
         "Mining finished for a block at attacker node i" -->  ("finished", "block")
         "receive block at attacker node i" --> ("receive", "block")
+    With the global mining engine (see mining.py) there is one more event, not executed by any node:
+        "next POW completion in the network" --> ("mining", "race")
+
+    Events are not compared directly, the event queue orders them by (timestamp, sequence number) tuples.
     '''
+    __slots__ = ("timestamp", "createdBy", "executedBy", "eventObject", "eventType", "pending", "cancelled")
+
     def __init__(self, timestamp, createdBy, executedBy, eventObject, eventType):
-        self.eventID = secrets.token_hex(32)
         self.timestamp = timestamp
         self.createdBy = createdBy
         self.executedBy = executedBy
         self.eventObject = eventObject
         self.eventType = eventType
+        self.pending = False
+        self.cancelled = False
 
-    # Comparator function for priority queue (sorted by increasing order of timestamp)
-    def __lt__(self, otherEvent):
-        return self.timestamp < otherEvent.timestamp
+    # Execute the Event based on role of the executing node and eventType, with the handlers of dispatch (default dispatchTable)
+    # Returns future events to be added, events to be cancelled and the outcome of the event (e.g. "Successful!")
+    def execute(self, nodeArray, dispatch=None):
 
-    # Execute the Event based on eventType
-    def execute(self, nodeArray):
+        # Genesis event is not executed by any node
+        role = "honest" if self.executedBy is None else nodeArray[self.executedBy].role
 
-        # Checking if event is related to a attack node
-        if (self.executedBy is not None) and (type(nodeArray[self.executedBy]).__name__ == "AttackNode"):
-            
-            # Printing to terminal
-            print("EVENT: Timestamp: " + str(self.timestamp) + " milliseconds, Type: " + self.eventType[0] + " " + self.eventType[1] + " at attack node " + str(self.executedBy) + " : ", end='')
+        return (dispatchTable if dispatch is None else dispatch)[role, self.eventType](self, nodeArray)
 
-            if self.eventType[0] == "create":
-                if self.eventType[1] == "TXN":
-                    return self.create_transaction_attack_node(nodeArray)
-                else:
-                    return self.create_block_attack_node(nodeArray)
+    # Receive events of a message (TXN or Block) sent by the executing node to all its peers except excludedPeer, size of the message is numberOfKBs
+    # Same latencies as calculate_latency for each peer in turn, with the queueing delays of all the peers taken from the pool at once
+    def fan_out(self, nodeArray, message, numberOfKBs, eventType, excludedPeer=None):
+        node = nodeArray[self.executedBy]
+        links = node.link_constants()
+        queueingDelays = node.latencyPool.standard(len(links) - (excludedPeer in links))
 
-            elif self.eventType[0] == "finished" and self.eventType[1] == "block":
-                return self.finished_block_attack_node(nodeArray)
+        # Message Size in bits
+        messageSize = numberOfKBs * 8000
 
-            else:
-                if self.eventType[1] == "TXN":
-                    return self.receive_transaction_attack_node(nodeArray)
-                else:
-                    return self.receive_block_attack_node(nodeArray)
+        futureEvents = []
+        for peer, (propagation_delay, link_speed, mean_queueing_delay) in links.items():
+            if peer == excludedPeer:
+                continue
+            latency = propagation_delay + (messageSize / link_speed) + mean_queueing_delay * queueingDelays[len(futureEvents)]
+            futureEvents.append(Event(self.timestamp + round(latency), self.executedBy, peer, message, eventType))
+
+        return futureEvents
+
+    # Transactions created by the executing node sent to its peers (message is a TXN or a list of them, 1 KB per transaction)
+    # With first passage propagation (see propagation.py) they are delivered to all the nodes directly and no event is created
+    def send_transactions(self, nodeArray, message, txns, eventType):
+        propagation = nodeArray[self.executedBy].txnPropagation
+        if propagation is None:
+            return self.fan_out(nodeArray, message, len(txns), eventType)
+
+        propagation.propagate(nodeArray, self.executedBy, txns, self.timestamp)
+        return []
+
+    # Mining decision at the end of a block event: a free node starts mining on its chosen tip right away (same as a
+    # ("create", "block") event at this timestamp), a busy node keeps its pending POW completion (broadcast or finished
+    # event), which is only cancelled and drawn again when the tip changes. POW times are exponential (memoryless), so
+    # keeping the pending completion is statistically the same as drawing a new one.
+    def start_mining(self, nodeArray):
+        node = nodeArray[self.executedBy]
+        if node.status != "free":
+            return []
+
+        futureEvents, _, _ = dispatchTable[node.role, ("create", "block")](self, nodeArray)
+        return futureEvents
+
+    # Event completing the POW of a block mined by the executing node (broadcast or finished event)
+    # With the per node mining engine it comes after the node's own POW time and is added to futureEvents, with the global
+    # engine it is only held by the node (timestamp None) until the node wins a mining race
+    def pow_completion(self, nodeArray, block, eventType, futureEvents):
+        node = nodeArray[self.executedBy]
+        if node.miningEngine == "global":
+            return Event(None, self.executedBy, self.executedBy, block, eventType)
+
+        # Calculating timestamp of the future event (Completing the created block after POW)
+        future_timestamp = self.timestamp + round(node.calculate_POW_time())
+        futureEvents.append(Event(future_timestamp, self.executedBy, self.executedBy, block, eventType))
+        return futureEvents[-1]
+
+    # Next POW completion in the network (global mining engine): the winner's pending block is completed now
+    # Races come after the events of the nodes at their timestamp (see EventQueue), so the completion is executed after all the
+    # other events of the winner at this timestamp
+    def mining_race(self, nodeArray):
+        race = self.eventObject
+        completion = MiningRace.pending_completion(nodeArray[race.pick_winner()])
 
+        futureEvents = []
+        cancelledEvents = []
 
+        if completion is not None:
+            completion.timestamp = self.timestamp
+            futureEvents.append(completion)
+            outcome = "Successful!"
         else:
-            # Printing to terminal
-            print("EVENT: Timestamp: " + str(self.timestamp) + " milliseconds, Type: " + self.eventType[0] + (" block creation : " if self.eventType[0] == "genesis" else " " + self.eventType[1] + " at node " + str(self.executedBy) + " : "), end='')
-            
-            if self.eventType[0] == "genesis":
-                return self.create_genesis_block(nodeArray)
+            outcome = "Failed! (Winner Not Mining)"
 
-            elif self.eventType[0] == "create":
-                if self.eventType[1] == "TXN":
-                    return self.create_transaction(nodeArray)
-                else:
-                    return self.create_block(nodeArray)
+        # Adding the next race
+        futureEvents.append(Event(self.timestamp + round(race.next_block_time()), None, None, race, ("mining", "race")))
 
-            elif self.eventType[0] == "broadcast" and self.eventType[1] == "block":
-                return self.broadcast_block(nodeArray)
-
-            else:
-                if self.eventType[1] == "TXN":
-                    return self.receive_transaction(nodeArray)
-                else:
-                    return self.receive_block(nodeArray)
+        return futureEvents, cancelledEvents, outcome
 
     # Create genesis block
     def create_genesis_block(self, nodeArray):
         genesisTransactions = []
+        genesisRNG = self.eventObject
 
         # Adding a random amount from 500 - 1500 coins in each node
         for i in range(len(nodeArray)):
-            amount = random.randint(500, 1500)
+            amount = int(genesisRNG.integers(500, 1501))
             # Here -1 means initial amount given, by God
-            genesisTransactions.append(TXN(0, -1, nodeArray[i].nodeID, amount, False))
+            genesisTransactions.append(TXN(0, -1, nodeArray[i].nodeID, amount, False, genesisRNG))
 
         # Creating the genesis block
         genesisBlock = Block(0, None, True, genesisTransactions)
@@ -120,20 +165,24 @@ class Event:
         futureEvents = []
         cancelledEvents = []
 
-        # Adding future transactional events for all the nodes at timestamp 1
+        # Adding future transactional events for all the nodes at timestamp 1 (no transactions in block only mode)
+        # With batched transaction generation the first batch holds the transactions created until timestamp 1 + txnBatchInterval
         for i in range(len(nodeArray)):
-            futureEvents.append(Event(1, None, nodeArray[i].nodeID, None, ("create", "TXN")))
+            if nodeArray[i].blockSizes is not None:
+                continue
+            if nodeArray[i].txnBatchInterval is None:
+                futureEvents.append(Event(1, None, nodeArray[i].nodeID, None, ("create", "TXN")))
+            else:
+                futureEvents.append(Event(1 + nodeArray[i].txnBatchInterval, None, nodeArray[i].nodeID, None, ("create", "TXNs")))
 
         # Adding future create Block events for all the nodes at timestamp 1
         for i in range(len(nodeArray)):
             futureEvents.append(Event(1, None, nodeArray[i].nodeID, None, ("create", "block")))
 
         # Random shuffling for randomness
-        random.shuffle(futureEvents)
-
-        print("Successful!")
+        genesisRNG.shuffle(futureEvents)
 
-        return futureEvents, cancelledEvents
+        return futureEvents, cancelledEvents, "Successful!"
 
     # Create transaction at attack node i
     def create_transaction_attack_node(self, nodeArray):
@@ -142,21 +191,18 @@ class Event:
         futureEvents = []
         cancelledEvents = []
 
-        # Transmit created transaction to peer nodes
-        for peer in nodeArray[self.executedBy].peers.keys():
-            # Calculating timestamp of the future event, size of txn is 1KB
-            future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(1, peer))
+        observers = nodeArray[self.executedBy].observers
+        if observers is not None and observers.txnCreated:
+            observers.notify("txnCreated", { "timestamp": self.timestamp, "nodeID": self.executedBy, "txn": txn })
 
-            # Adding event to receive the transaction at the peers
-            futureEvents.append(Event(future_timestamp, self.executedBy, peer, txn, ("receive", "TXN")))
+        # Transmit created transaction to peer nodes
+        futureEvents.extend(self.send_transactions(nodeArray, txn, [txn], ("receive", "TXN")))
 
         # Add event to create transaction after an exponential time gap (exponential interarrival time)
         future_timestamp = self.timestamp + round(nodeArray[self.executedBy].next_create_transaction_delay())
         futureEvents.append(Event(future_timestamp, self.executedBy, self.executedBy, None, ("create", "TXN")))
 
-        print("Successful!")
-
-        return futureEvents, cancelledEvents
+        return futureEvents, cancelledEvents, "Successful!"
 
     # Create transaction at node i
     def create_transaction(self, nodeArray):
@@ -165,21 +211,61 @@ class Event:
         futureEvents = []
         cancelledEvents = []
 
-        # Transmit created transaction to peer nodes
-        for peer in nodeArray[self.executedBy].peers.keys():
-            # Calculating timestamp of the future event, size of txn is 1KB
-            future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(1, peer))
+        observers = nodeArray[self.executedBy].observers
+        if observers is not None and observers.txnCreated:
+            observers.notify("txnCreated", { "timestamp": self.timestamp, "nodeID": self.executedBy, "txn": txn })
 
-            # Adding event to receive the transaction at the peers
-            futureEvents.append(Event(future_timestamp, self.executedBy, peer, txn, ("receive", "TXN")))
+        # Transmit created transaction to peer nodes
+        futureEvents.extend(self.send_transactions(nodeArray, txn, [txn], ("receive", "TXN")))
 
         # Add event to create transaction after an exponential time gap (exponential interarrival time)
         future_timestamp = self.timestamp + round(nodeArray[self.executedBy].next_create_transaction_delay())
         futureEvents.append(Event(future_timestamp, self.executedBy, self.executedBy, None, ("create", "TXN")))
 
-        print("Successful!")
+        return futureEvents, cancelledEvents, "Successful!"
+
+    # Create a batch of transactions at node i (honest or attack node)
+    def create_transaction_batch(self, nodeArray):
+        node = nodeArray[self.executedBy]
+        txns = node.create_transaction_batch(nodeArray, self.timestamp)
+
+        futureEvents = []
+        cancelledEvents = []
+
+        if node.observers is not None and node.observers.txnCreated:
+            for txn in txns:
+                node.observers.notify("txnCreated", { "timestamp": txn.creationTime, "nodeID": self.executedBy, "txn": txn })
+
+        # Transmit the batch to peer nodes as one message (1 KB per transaction)
+        if txns:
+            futureEvents.extend(self.send_transactions(nodeArray, txns, txns, ("receive", "TXNs")))
+
+        # Add event to create the next batch
+        futureEvents.append(Event(self.timestamp + node.txnBatchInterval, self.executedBy, self.executedBy, None, ("create", "TXNs")))
 
-        return futureEvents, cancelledEvents
+        return futureEvents, cancelledEvents, "Successful!"
+
+    # Receive a batch of transactions at node i (honest or attack node)
+    def receive_transaction_batch(self, nodeArray):
+        node = nodeArray[self.executedBy]
+
+        # Loop-Less transaction forwarding
+        # Only the transactions not heard yet at this node are processed and sent to peers
+        txns = [txn for txn in self.eventObject if txn.TXNID not in node.heardTXNs]
+        if not txns:
+            return [], [], "Already Heard!"
+
+        for txn in txns:
+            node.receive_transaction(txn)
+
+        futureEvents = []
+        cancelledEvents = []
+
+        # Transmit the new transactions to peer nodes as one message
+        # The receive event is created by the transmitting node, so ignoring it for Loop-Less transaction forwarding
+        futureEvents.extend(self.fan_out(nodeArray, txns, len(txns), ("receive", "TXNs"), self.createdBy))
+
+        return futureEvents, cancelledEvents, "Successful!"
 
     # Receive transaction at attack node i
     def receive_transaction_attack_node(self, nodeArray):
@@ -190,8 +276,7 @@ class Event:
         # Checking if the transaction is already heard at this node
         # If heard then transaction is already processed (sent to peers) in the past
         if txn.TXNID in nodeArray[self.executedBy].heardTXNs:
-            print("Already Heard!")
-            return [], []
+            return [], [], "Already Heard!"
 
         nodeArray[self.executedBy].receive_transaction(txn)
 
@@ -199,20 +284,10 @@ class Event:
         cancelledEvents = []
 
         # Transmit received transaction to peer nodes
-        for peer in nodeArray[self.executedBy].peers.keys():
-            # The receive event is created by the transmitting node, so ignoring it for Loop-Less transaction forwarding
-            if peer == self.createdBy:
-                continue
+        # The receive event is created by the transmitting node, so ignoring it for Loop-Less transaction forwarding
+        futureEvents.extend(self.fan_out(nodeArray, txn, 1, ("receive", "TXN"), self.createdBy))
 
-            # Calculating timestamp of the future event, size of txn is 1KB
-            future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(1, peer))
-
-            # Adding event to receive the transaction at the peers
-            futureEvents.append(Event(future_timestamp, self.executedBy, peer, txn, ("receive", "TXN")))
-
-        print("Successful!")
-
-        return futureEvents, cancelledEvents
+        return futureEvents, cancelledEvents, "Successful!"
 
     # Receive transaction at node i
     def receive_transaction(self, nodeArray):
@@ -223,8 +298,7 @@ class Event:
         # Checking if the transaction is already heard at this node
         # If heard then transaction is already processed (sent to peers) in the past
         if txn.TXNID in nodeArray[self.executedBy].heardTXNs:
-            print("Already Heard!")
-            return [], []
+            return [], [], "Already Heard!"
 
         nodeArray[self.executedBy].receive_transaction(txn)
 
@@ -232,28 +306,17 @@ class Event:
         cancelledEvents = []
 
         # Transmit received transaction to peer nodes
-        for peer in nodeArray[self.executedBy].peers.keys():
-            # The receive event is created by the transmitting node, so ignoring it for Loop-Less transaction forwarding
-            if peer == self.createdBy:
-                continue
+        # The receive event is created by the transmitting node, so ignoring it for Loop-Less transaction forwarding
+        futureEvents.extend(self.fan_out(nodeArray, txn, 1, ("receive", "TXN"), self.createdBy))
 
-            # Calculating timestamp of the future event, size of txn is 1KB
-            future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(1, peer))
-
-            # Adding event to receive the transaction at the peers
-            futureEvents.append(Event(future_timestamp, self.executedBy, peer, txn, ("receive", "TXN")))
-
-        print("Successful!")
-
-        return futureEvents, cancelledEvents
+        return futureEvents, cancelledEvents, "Successful!"
 
     # Create block at attack node i
     def create_block_attack_node(self, nodeArray):
         
         # Node is busy mining other block (not free)
         if not (nodeArray[self.executedBy].status == "free"):
-            print("Node busy!")
-            return [], []
+            return [], [], "Node busy!"
 
         futureEvents = []
         cancelledEvents = []
@@ -262,51 +325,36 @@ class Event:
         if nodeArray[self.executedBy].atStateZero_ :
             block = nodeArray[self.executedBy].create_block_at_state_zero_dash(self.timestamp, nodeArray)
 
-            # Calculating timestamp of the future event (Broadcasting the created block after POW)
-            future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_POW_time())
-
-            # Adding finished event in the future
-            futureEvents.append(Event(future_timestamp, self.executedBy, self.executedBy, block, ("finished", "block")))
-            nodeArray[self.executedBy].futureEvents = [futureEvents[-1].eventID]
+            # Adding finished event in the future (after POW)
+            finishedEvent = self.pow_completion(nodeArray, block, ("finished", "block"), futureEvents)
+            nodeArray[self.executedBy].futureEvents = [finishedEvent]
 
         else:
             # For other states the block is generated on longest chain (both including private and public) 
             block = nodeArray[self.executedBy].create_block(self.timestamp, nodeArray)
 
-            # Calculating timestamp of the future event (Broadcasting the created block after POW)
-            future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_POW_time())
-
-            # Adding finished event in the future
-            futureEvents.append(Event(future_timestamp, self.executedBy, self.executedBy, block, ("finished", "block")))
-            nodeArray[self.executedBy].futureEvents = [futureEvents[-1].eventID]
+            # Adding finished event in the future (after POW)
+            finishedEvent = self.pow_completion(nodeArray, block, ("finished", "block"), futureEvents)
+            nodeArray[self.executedBy].futureEvents = [finishedEvent]
 
-        print("Successful!")
-
-        return futureEvents, cancelledEvents
+        return futureEvents, cancelledEvents, "Successful!"
 
     # Create block at node i
     def create_block(self, nodeArray):
         
         # Node is busy mining other block (not free)
         if not (nodeArray[self.executedBy].status == "free"):
-            print("Node busy!")
-            return [], []
+            return [], [], "Node busy!"
 
         block = nodeArray[self.executedBy].create_block(self.timestamp, nodeArray)
 
         futureEvents = []
         cancelledEvents = []
 
-        # Calculating timestamp of the future event (Broadcasting the created block after POW)
-        future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_POW_time())
-
-        # Adding broadcast event in the future
-        futureEvents.append(Event(future_timestamp, self.executedBy, self.executedBy, block, ("broadcast", "block")))
-        nodeArray[self.executedBy].futureBroadCastEvent = futureEvents[-1].eventID
-
-        print("Successful!")
+        # Adding broadcast event in the future (after POW)
+        nodeArray[self.executedBy].futureBroadCastEvent = self.pow_completion(nodeArray, block, ("broadcast", "block"), futureEvents)
 
-        return futureEvents, cancelledEvents
+        return futureEvents, cancelledEvents, "Successful!"
 
     # Mining on block finishes at attack node i
     def finished_block_attack_node(self, nodeArray):
@@ -322,38 +370,48 @@ class Event:
             # If the longest chain, broadcast the block (attacker wins and makes his/her block public)
             if nodeArray[self.executedBy].broadcast_block_at_state_zero_dash(block, self.timestamp):
 
+                observers = nodeArray[self.executedBy].observers
+                if observers is not None and observers.blockMined:
+                    observers.notify("blockMined", { "timestamp": self.timestamp, "nodeID": self.executedBy, "block": block, "private": False })
+
                 # Size of the block in KBs
-                blockSize = len(block.transactions)
+                blockSize = block.size
 
                 # Broadcast the new block to the peer nodes
-                for peer in nodeArray[self.executedBy].peers.keys():
-
-                    # Calculating timestamp of the future event depending size of block
-                    future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(blockSize, peer))
+                futureEvents.extend(self.fan_out(nodeArray, block, blockSize, ("receive", "block")))
 
-                    # Adding event to receive the block at the peers
-                    futureEvents.append(Event(future_timestamp, self.executedBy, peer, block, ("receive", "block")))
-
-                print("Successful!")
+                outcome = "Successful!"
             else:
-                print("Failed! (Not Longest Chain)")
+                outcome = "Failed! (Not Longest Chain)"
+
+            observers = nodeArray[self.executedBy].observers
+            if observers is not None and observers.attackState:
+                observers.notify("attackState", { "timestamp": self.timestamp, "nodeID": self.executedBy, "privateBlocks": len(nodeArray[self.executedBy].privateChain), "stateZeroDash": nodeArray[self.executedBy].atStateZero_ })
 
-            # Adding an block creation event at same timestamp (broadcast event over)
-            futureEvents.append(Event(self.timestamp, self.executedBy, self.executedBy, None, ("create", "block")))
+            # Mining the next block if the node is free (broadcast event over)
+            futureEvents.extend(self.start_mining(nodeArray))
 
-            return futureEvents, cancelledEvents
+            return futureEvents, cancelledEvents, outcome
 
         else:
             # If the same longest chain, add block into the private chain
             if nodeArray[self.executedBy].finished_block(block, self.timestamp):
-                print("Successful!")
+                observers = nodeArray[self.executedBy].observers
+                if observers is not None and observers.blockMined:
+                    observers.notify("blockMined", { "timestamp": self.timestamp, "nodeID": self.executedBy, "block": block, "private": True })
+
+                outcome = "Successful!"
             else:
-                print("Failed! (Not Longest Chain)")
+                outcome = "Failed! (Not Longest Chain)"
 
-            # Adding an block creation event at same timestamp (mining event over)
-            futureEvents.append(Event(self.timestamp, self.executedBy, self.executedBy, None, ("create", "block")))
+            observers = nodeArray[self.executedBy].observers
+            if observers is not None and observers.attackState:
+                observers.notify("attackState", { "timestamp": self.timestamp, "nodeID": self.executedBy, "privateBlocks": len(nodeArray[self.executedBy].privateChain), "stateZeroDash": nodeArray[self.executedBy].atStateZero_ })
 
-            return futureEvents, cancelledEvents
+            # Mining the next block if the node is free (mining event over)
+            futureEvents.extend(self.start_mining(nodeArray))
+
+            return futureEvents, cancelledEvents, outcome
 
     # Broadcast block at node i
     def broadcast_block(self, nodeArray):
@@ -366,26 +424,24 @@ class Event:
         # If the same longest chain, broadcast the block
         if nodeArray[self.executedBy].broadcast_block(block, self.timestamp):
 
+            observers = nodeArray[self.executedBy].observers
+            if observers is not None and observers.blockMined:
+                observers.notify("blockMined", { "timestamp": self.timestamp, "nodeID": self.executedBy, "block": block, "private": False })
+
             # Size of the block in KBs
-            blockSize = len(block.transactions)
+            blockSize = block.size
 
             # Broadcast the new block to the peer nodes
-            for peer in nodeArray[self.executedBy].peers.keys():
+            futureEvents.extend(self.fan_out(nodeArray, block, blockSize, ("receive", "block")))
 
-                # Calculating timestamp of the future event depending size of block
-                future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(blockSize, peer))
-
-                # Adding event to receive the block at the peers
-                futureEvents.append(Event(future_timestamp, self.executedBy, peer, block, ("receive", "block")))
-
-            print("Successful!")
+            outcome = "Successful!"
         else:
-            print("Failed! (Not Longest Chain)")
+            outcome = "Failed! (Not Longest Chain)"
 
-        # Adding an block creation event at same timestamp (broadcast event over)
-        futureEvents.append(Event(self.timestamp, self.executedBy, self.executedBy, None, ("create", "block")))
+        # Mining the next block if the node is free (broadcast event over)
+        futureEvents.extend(self.start_mining(nodeArray))
 
-        return futureEvents, cancelledEvents
+        return futureEvents, cancelledEvents, outcome
 
     # Receive block at attack node i
     def receive_block_attack_node(self, nodeArray):
@@ -396,8 +452,7 @@ class Event:
         # Checking if the block is already heard at this node
         # If heard then block is already processed in the past
         if block.blockHash in nodeArray[self.executedBy].blocksTree:
-            print("Already Heard!")
-            return [], []
+            return [], [], "Already Heard!"
 
         futureEvents = []
         cancelledEvents = []
@@ -405,6 +460,10 @@ class Event:
         # If valid block then change the state
         if nodeArray[self.executedBy].validate_block(self.timestamp, block, nodeArray):
 
+            observers = nodeArray[self.executedBy].observers
+            if observers is not None and observers.blockAccepted:
+                observers.notify("blockAccepted", { "timestamp": self.timestamp, "nodeID": self.executedBy, "block": block, "fromNode": self.createdBy })
+
             # If node is not doing any selfish mining or if the LVC exceeds the length of the selfish miner’s private chain then start a new attack on the last block of the longest chain visible.
             if (nodeArray[self.executedBy].lastBlock is None) or (nodeArray[self.executedBy].lastBlock.depth < block.depth):
                 
@@ -427,17 +486,15 @@ class Event:
                     else:
                         nodeArray[self.executedBy].leafBlocks[privateBlock[1].blockHash] = privateBlock[1]
 
+                    observers = nodeArray[self.executedBy].observers
+                    if observers is not None and observers.privateBlockReleased:
+                        observers.notify("privateBlockReleased", { "timestamp": self.timestamp, "nodeID": self.executedBy, "block": privateBlock[1] })
+
                     # Size of the block in KBs
-                    blockSize = len(privateBlock[1].transactions)
+                    blockSize = privateBlock[1].size
 
                     # Transmitting the block to the peer nodes
-                    for peer in nodeArray[self.executedBy].peers.keys():
-
-                        # Calculating timestamp of the future event depending size of block
-                        future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(blockSize, peer))
-
-                        # Adding event to receive the block at the peers
-                        futureEvents.append(Event(future_timestamp, self.executedBy, peer, privateBlock[1], ("receive", "block")))
+                    futureEvents.extend(self.fan_out(nodeArray, privateBlock[1], blockSize, ("receive", "block")))
 
                 nodeArray[self.executedBy].privateChain = []
 
@@ -474,17 +531,15 @@ class Event:
                     else:
                         nodeArray[self.executedBy].leafBlocks[privateBlock[1].blockHash] = privateBlock[1]
 
+                    observers = nodeArray[self.executedBy].observers
+                    if observers is not None and observers.privateBlockReleased:
+                        observers.notify("privateBlockReleased", { "timestamp": self.timestamp, "nodeID": self.executedBy, "block": privateBlock[1] })
+
                     # Size of the block in KBs
-                    blockSize = len(privateBlock[1].transactions)
+                    blockSize = privateBlock[1].size
 
                     # Transmitting the block to the peer nodes
-                    for peer in nodeArray[self.executedBy].peers.keys():
-
-                        # Calculating timestamp of the future event depending size of block
-                        future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(blockSize, peer))
-
-                        # Adding event to receive the block at the peers
-                        futureEvents.append(Event(future_timestamp, self.executedBy, peer, privateBlock[1], ("receive", "block")))
+                    futureEvents.extend(self.fan_out(nodeArray, privateBlock[1], blockSize, ("receive", "block")))
 
                     nodeArray[self.executedBy].privateChain = []
 
@@ -507,17 +562,15 @@ class Event:
                         else:
                             nodeArray[self.executedBy].leafBlocks[privateBlock[1].blockHash] = privateBlock[1]
 
+                        observers = nodeArray[self.executedBy].observers
+                        if observers is not None and observers.privateBlockReleased:
+                            observers.notify("privateBlockReleased", { "timestamp": self.timestamp, "nodeID": self.executedBy, "block": privateBlock[1] })
+
                         # Size of the block in KBs
-                        blockSize = len(privateBlock[1].transactions)
+                        blockSize = privateBlock[1].size
 
                         # Transmitting the block to the peer nodes
-                        for peer in nodeArray[self.executedBy].peers.keys():
-
-                            # Calculating timestamp of the future event depending size of block
-                            future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(blockSize, peer))
-
-                            # Adding event to receive the block at the peers
-                            futureEvents.append(Event(future_timestamp, self.executedBy, peer, privateBlock[1], ("receive", "block")))
+                        futureEvents.extend(self.fan_out(nodeArray, privateBlock[1], blockSize, ("receive", "block")))
 
                     nodeArray[self.executedBy].privateChain = []
 
@@ -541,26 +594,28 @@ class Event:
                         else:
                             nodeArray[self.executedBy].leafBlocks[privateBlock[1].blockHash] = privateBlock[1]
 
+                        observers = nodeArray[self.executedBy].observers
+                        if observers is not None and observers.privateBlockReleased:
+                            observers.notify("privateBlockReleased", { "timestamp": self.timestamp, "nodeID": self.executedBy, "block": privateBlock[1] })
+
                         # Size of the block in KBs
-                        blockSize = len(privateBlock[1].transactions)
+                        blockSize = privateBlock[1].size
 
                         # Transmitting the block to the peer nodes
-                        for peer in nodeArray[self.executedBy].peers.keys():
+                        futureEvents.extend(self.fan_out(nodeArray, privateBlock[1], blockSize, ("receive", "block")))
 
-                            # Calculating timestamp of the future event depending size of block
-                            future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(blockSize, peer))
+            observers = nodeArray[self.executedBy].observers
+            if observers is not None and observers.attackState:
+                observers.notify("attackState", { "timestamp": self.timestamp, "nodeID": self.executedBy, "privateBlocks": len(nodeArray[self.executedBy].privateChain), "stateZeroDash": nodeArray[self.executedBy].atStateZero_ })
 
-                            # Adding event to receive the block at the peers
-                            futureEvents.append(Event(future_timestamp, self.executedBy, peer, privateBlock[1], ("receive", "block")))
-
-            print("Successful!")
+            outcome = "Successful!"
         else:
-            print("Failed! Invalid Block")
+            outcome = "Failed! Invalid Block"
 
-        # Adding an block creation event at same timestamp (validation event over)
-        futureEvents.append(Event(self.timestamp, self.executedBy, self.executedBy, None, ("create", "block")))
+        # Mining a new block if the node became free, e.g. on a longer chain (validation event over)
+        futureEvents.extend(self.start_mining(nodeArray))
 
-        return futureEvents, cancelledEvents
+        return futureEvents, cancelledEvents, outcome
 
     # Receive block at node i
     def receive_block(self, nodeArray):
@@ -571,30 +626,33 @@ class Event:
         # Checking if the block is already heard at this node
         # If heard then block is already processed (validated and sent to peers) in the past
         if block.blockHash in nodeArray[self.executedBy].blocksSeen:
-            print("Already Heard!")
-            return [], []
+            return [], [], "Already Heard!"
 
         futureEvents = []
         cancelledEvents = []
 
+        # Reorgs are only looked for when observed (the tip of the longest chain is not kept by the node)
+        observers = nodeArray[self.executedBy].observers
+        oldTip = chain_tip(nodeArray[self.executedBy]) if observers is not None and observers.reorg else None
+
         # If valid block then transmit to peers
         if nodeArray[self.executedBy].validate_block(self.timestamp, block, nodeArray):
 
-             # Size of the block in KBs
-            blockSize = len(block.transactions)
-
-            # Transmitting the block to the peer nodes
-            for peer in nodeArray[self.executedBy].peers.keys():
+            if observers is not None and observers.blockAccepted:
+                observers.notify("blockAccepted", { "timestamp": self.timestamp, "nodeID": self.executedBy, "block": block, "fromNode": self.createdBy })
 
-                # The receive event is created by the transmitting node, so ignoring it for Loop-Less Block forwarding
-                if peer == self.createdBy:
-                    continue
+            if oldTip is not None:
+                newTip = chain_tip(nodeArray[self.executedBy])
+                depth = reorg_depth(oldTip, newTip)
+                if depth:
+                    observers.notify("reorg", { "timestamp": self.timestamp, "nodeID": self.executedBy, "oldTip": oldTip, "newTip": newTip, "depth": depth })
 
-                # Calculating timestamp of the future event depending size of block
-                future_timestamp = self.timestamp + round(nodeArray[self.executedBy].calculate_latency(blockSize, peer))
+             # Size of the block in KBs
+            blockSize = block.size
 
-                # Adding event to receive the block at the peers
-                futureEvents.append(Event(future_timestamp, self.executedBy, peer, block, ("receive", "block")))
+            # Transmitting the block to the peer nodes
+            # The receive event is created by the transmitting node, so ignoring it for Loop-Less Block forwarding
+            futureEvents.extend(self.fan_out(nodeArray, block, blockSize, ("receive", "block"), self.createdBy))
 
             # Checking if the added block is now the longest chain and cancelling broadcast event in future for this node if true (Mining shifted to longest chain)
             if nodeArray[self.executedBy].status == "mining" and block.depth >= nodeArray[self.executedBy].depthOfMiningBlock:
@@ -603,11 +661,31 @@ class Event:
                 nodeArray[self.executedBy].futureBroadCastEvent = None
                 nodeArray[self.executedBy].depthOfMiningBlock = -1
 
-            print("Successful!")
+            outcome = "Successful!"
         else:
-            print("Failed! Invalid Block")
-
-        # Adding an block creation event at same timestamp (validation event over)
-        futureEvents.append(Event(self.timestamp, self.executedBy, self.executedBy, None, ("create", "block")))
-
-        return futureEvents, cancelledEvents
\ No newline at end of file
+            outcome = "Failed! Invalid Block"
+
+        # Mining a new block if the node became free, e.g. on a longer chain (validation event over)
+        futureEvents.extend(self.start_mining(nodeArray))
+
+        return futureEvents, cancelledEvents, outcome
+
+# Handler of each event, indexed by (role of the executing node, eventType)
+dispatchTable = {
+    ("honest", ("genesis",)): Event.create_genesis_block,
+    ("honest", ("mining", "race")): Event.mining_race,
+    ("honest", ("create", "TXN")): Event.create_transaction,
+    ("honest", ("receive", "TXN")): Event.receive_transaction,
+    ("honest", ("create", "TXNs")): Event.create_transaction_batch,
+    ("honest", ("receive", "TXNs")): Event.receive_transaction_batch,
+    ("honest", ("create", "block")): Event.create_block,
+    ("honest", ("broadcast", "block")): Event.broadcast_block,
+    ("honest", ("receive", "block")): Event.receive_block,
+    ("attack", ("create", "TXN")): Event.create_transaction_attack_node,
+    ("attack", ("receive", "TXN")): Event.receive_transaction_attack_node,
+    ("attack", ("create", "TXNs")): Event.create_transaction_batch,
+    ("attack", ("receive", "TXNs")): Event.receive_transaction_batch,
+    ("attack", ("create", "block")): Event.create_block_attack_node,
+    ("attack", ("finished", "block")): Event.finished_block_attack_node,
+    ("attack", ("receive", "block")): Event.receive_block_attack_node,
+}
@@ -13,7 +13,7 @@ def generate_connectivity_graph(nodeArray):
             G.add_edge(node.nodeID, peer)
     return G
 
-def generate_node_connectivity_graph(nodeArray, colors):
+def generate_node_connectivity_graph(nodeArray, colors, directory="./Results"):
     # Generate the connectivity graph
     connectivity_graph = generate_connectivity_graph(nodeArray)
 
@@ -27,14 +27,16 @@ def generate_node_connectivity_graph(nodeArray, colors):
     plt.title("Node Connectivity Graph")
 
     # Saving the graph as an image file
-    plt.savefig("./Results/GraphOfNodes/node_connectivity_graph_of_N_Nodes.png")
+    plt.savefig(directory + "/GraphOfNodes/node_connectivity_graph_of_N_Nodes.png")
+    # Closing the figure, the next simulation of the process starts a new one
+    plt.close()
     # plt.savefig("node_connectivity_graph.png")
 
     # To Show the graph
     # plt.show()
 
 
-def generate_blockchain_graph_of_one_node(node, colors, N):
+def generate_blockchain_graph_of_one_node(node, colors, N, directory="./Results"):
     '''
         This function creates Graph of the blocktree maintained in a node/peer
     '''
@@ -84,8 +86,8 @@ def generate_blockchain_graph_of_one_node(node, colors, N):
     blockchain_digraph.attr(rankdir='RL')
 
     # Define the filenames for saving the PNG and PDF files
-    pngfilename = "./Results/BlockChains/PNG/blockchain_graph_of_node_"+str(node.nodeID)
-    pdfilename = "./Results/BlockChains/PDF/blockchain_graph_of_node_"+str(node.nodeID)
+    pngfilename = directory + "/BlockChains/PNG/blockchain_graph_of_node_"+str(node.nodeID)
+    pdfilename = directory + "/BlockChains/PDF/blockchain_graph_of_node_"+str(node.nodeID)
 
     # Render and save the blockchain digraph as a PNG image
     blockchain_digraph.render(pngfilename, format='png', cleanup=True)
@@ -93,7 +95,7 @@ def generate_blockchain_graph_of_one_node(node, colors, N):
      # Render and save the blockchain digraph as a PDF document
     blockchain_digraph.render(pdfilename, format='pdf', cleanup=True)
 
-def generate_blockchain_graph_of_one_attack_node(node, colors, N):
+def generate_blockchain_graph_of_one_attack_node(node, colors, N, directory="./Results"):
     '''
         This function creates Graph of the blocktree maintained in a attack node/peer
     '''
@@ -153,8 +155,8 @@ def generate_blockchain_graph_of_one_attack_node(node, colors, N):
     blockchain_digraph.attr(rankdir='RL')
 
     # Define the filenames for saving the PNG and PDF files
-    pngfilename = "./Results/BlockChains/PNG/blockchain_graph_of_attack_node_"+str(node.nodeID)
-    pdfilename = "./Results/BlockChains/PDF/blockchain_graph_of_attack_node_"+str(node.nodeID)
+    pngfilename = directory + "/BlockChains/PNG/blockchain_graph_of_attack_node_"+str(node.nodeID)
+    pdfilename = directory + "/BlockChains/PDF/blockchain_graph_of_attack_node_"+str(node.nodeID)
 
     # Render and save the blockchain digraph as a PNG image
     blockchain_digraph.render(pngfilename, format='png', cleanup=True)
@@ -163,12 +165,13 @@ def generate_blockchain_graph_of_one_attack_node(node, colors, N):
     blockchain_digraph.render(pdfilename, format='pdf', cleanup=True)
 
 
-def generate_blockchain_graph_visualization(nodeArray, colors):
+def generate_blockchain_graph_visualization(nodeArray, colors, directory="./Results"):
     """
         Generate visualization for blockchain graphs for each node in the nodeArray.
 
         Parameters:
         - nodeArray: An array containing blockchain node objects.
+        - directory: Results directory the files are written to.
 
         Returns:
         - None
@@ -177,13 +180,13 @@ def generate_blockchain_graph_visualization(nodeArray, colors):
     #  one blockchain each and for each blockchain we will generate a visualization 
     for node in nodeArray[:-2]:    
         # Generate the blockchain visualization graph
-        generate_blockchain_graph_of_one_node(node, colors, len(nodeArray)-2)
+        generate_blockchain_graph_of_one_node(node, colors, len(nodeArray)-2, directory)
 
-    generate_blockchain_graph_of_one_attack_node(nodeArray[-2], colors, len(nodeArray)-2)
-    generate_blockchain_graph_of_one_attack_node(nodeArray[-1], colors, len(nodeArray)-2)
+    generate_blockchain_graph_of_one_attack_node(nodeArray[-2], colors, len(nodeArray)-2, directory)
+    generate_blockchain_graph_of_one_attack_node(nodeArray[-1], colors, len(nodeArray)-2, directory)
 
-def generate_records_of_one_node_txt(node):
-    filename = "./Results/Records/txt/InformationOfNode"+str(node.nodeID)+".txt"
+def generate_records_of_one_node_txt(node, directory="./Results"):
+    filename = directory + "/Records/txt/InformationOfNode"+str(node.nodeID)+".txt"
     # Open the file in write mode
     with open(filename, 'w') as f:
         f.write("#############################################################################################################################################################\n\n")
@@ -304,8 +307,8 @@ def generate_records_of_one_node_txt(node):
     print("Information written to  "+filename+"  successfully.")
     return 
 
-def generate_records_of_one_attack_node_txt(node):
-    filename = "./Results/Records/txt/InformationOfAttackNode"+str(node.nodeID)+".txt"
+def generate_records_of_one_attack_node_txt(node, directory="./Results"):
+    filename = directory + "/Records/txt/InformationOfAttackNode"+str(node.nodeID)+".txt"
     # Open the file in write mode
     with open(filename, 'w') as f:
         f.write("#############################################################################################################################################################\n\n")
@@ -452,9 +455,9 @@ def generate_records_of_one_attack_node_txt(node):
     return 
 
 
-def generate_records_of_one_node_html(node):
+def generate_records_of_one_node_html(node, directory="./Results"):
 
-    filename = "./Results/Records/HTML/InformationOfNode"+str(node.nodeID)+".html"
+    filename = directory + "/Records/HTML/InformationOfNode"+str(node.nodeID)+".html"
     with open(filename, 'w') as f:
         # Write HTML structure
         f.write("<!DOCTYPE html>\n")
@@ -551,9 +554,9 @@ def generate_records_of_one_node_html(node):
         # Close HTML structure
         f.write("</body>\n</html>")
 
-def generate_records_of_one_attack_node_html(node):
+def generate_records_of_one_attack_node_html(node, directory="./Results"):
 
-    filename = "./Results/Records/HTML/InformationOfAttackNode"+str(node.nodeID)+".html"
+    filename = directory + "/Records/HTML/InformationOfAttackNode"+str(node.nodeID)+".html"
     with open(filename, 'w') as f:
         # Write HTML structure
         f.write("<!DOCTYPE html>\n")
@@ -665,12 +668,13 @@ def generate_records_of_one_attack_node_html(node):
         f.write("</body>\n</html>")
 
 
-def generate_records_of_all_nodes(nodeArray):
+def generate_records_of_all_nodes(nodeArray, directory="./Results"):
     """
         Generate records of all nodes in the nodeArray.
 
         Parameters:
         - nodeArray: An array containing blockchain node objects.
+        - directory: Results directory the files are written to.
 
         Returns:
         - None
@@ -679,16 +683,16 @@ def generate_records_of_all_nodes(nodeArray):
     for node in nodeArray[:-2]:
         print("Recording all information of node "+ str(node.nodeID))
         
-        generate_records_of_one_node_html(node)
-        generate_records_of_one_node_txt(node)
+        generate_records_of_one_node_html(node, directory)
+        generate_records_of_one_node_txt(node, directory)
     
     print("Recording all information of node "+ str(nodeArray[-2].nodeID))
-    generate_records_of_one_attack_node_html(nodeArray[-2])
-    generate_records_of_one_attack_node_txt(nodeArray[-2])
+    generate_records_of_one_attack_node_html(nodeArray[-2], directory)
+    generate_records_of_one_attack_node_txt(nodeArray[-2], directory)
 
     print("Recording all information of node "+ str(nodeArray[-1].nodeID))
-    generate_records_of_one_attack_node_html(nodeArray[-1])
-    generate_records_of_one_attack_node_txt(nodeArray[-1])
+    generate_records_of_one_attack_node_html(nodeArray[-1], directory)
+    generate_records_of_one_attack_node_txt(nodeArray[-1], directory)
 
     print("Information of all of nodes Recorded!!")
     return
\ No newline at end of file
@@ -1,23 +1,29 @@
 #!/usr/bin/env python3
 from node import Node
 from attack import AttackNode
+from block import BlockSizes
+from propagation import FirstPassage
 from utils import create_graph, connected_graph
 from generateNodesGraph import generate_node_connectivity_graph
-import random
 
 # Initialize Nodes and assign Slow and Fast features.
 # PowI represents interarrival time between blocks on average
 # T_Tx represents the mean interarrival time between transactions
-def init_nodes(N, zeta_1, zeta_2, PoWI, T_Tx, colors):
+# streams is the registry of random number streams (RandomStreams) of the simulation
+# verbose prints the node and peers information, drawGraph saves the peer graph in resultsDirectory/GraphOfNodes
+def init_nodes(N, zeta_1, zeta_2, PoWI, T_Tx, colors, streams, verbose=True, drawGraph=True, resultsDirectory="./Results"):
 	
 	nodeArray = []
 
+	# Slow nodes and peer graph are drawn from the topology stream
+	topologyRNG = streams.stream("topology")
+
 	# Node IDs range from 0 to N-1
 	nodeIDs = list(range(0, N))
 
 	# Assigning 50 percent of nodes as 'slow' and the others as 'fast' randomly.
 	z0 = 0.5
-	random.shuffle(nodeIDs)
+	topologyRNG.shuffle(nodeIDs)
 	slowNodes = nodeIDs[:int(z0*N)]
 	fastNodes = nodeIDs[int(z0*N):]
 
@@ -34,20 +40,23 @@ def init_nodes(N, zeta_1, zeta_2, PoWI, T_Tx, colors):
 
 		hashPower = honestHashCPU
 
-		nodeArray.append(Node(nodeID, isSlow, hashPower, PoWI, T_Tx))
+		nodeArray.append(Node(nodeID, isSlow, hashPower, PoWI, T_Tx, streams))
 
 	# Attack Node with Node ID = N, and is fast and have a hash power of zeta_1
-	nodeArray.append(AttackNode(N, False, zeta_1, PoWI, T_Tx))
+	nodeArray.append(AttackNode(N, False, zeta_1, PoWI, T_Tx, streams))
 
 	# Attack Node with Node ID = N+1, and is fast and have a hash power of zeta_2
-	nodeArray.append(AttackNode(N+1, False, zeta_2, PoWI, T_Tx))
+	nodeArray.append(AttackNode(N+1, False, zeta_2, PoWI, T_Tx, streams))
 
 	nodeIDs.extend([N,N+1])
 	
 	print("Creating Node graph!")
 
 	# Creating a connected peer graph network
-	gen_graph(nodeArray, colors)
+	gen_graph(nodeArray, colors, topologyRNG, drawGraph, resultsDirectory)
+
+	if not verbose:
+		return nodeArray
 
 	# Printing Initialization details
 	print("")
@@ -76,18 +85,56 @@ def init_nodes(N, zeta_1, zeta_2, PoWI, T_Tx, colors):
 	return nodeArray
 
 # Generate graph and check if connected or not
-def gen_graph(nodeArray, colors):
+def gen_graph(nodeArray, colors, rng, drawGraph=True, resultsDirectory="./Results"):
 	while(True):
 		# Reinitalizing peers if not connected
 		for i in range(len(nodeArray)):
 			nodeArray[i].peers = dict()
 
-		create_graph(nodeArray)
+		create_graph(nodeArray, rng)
 
 		if(connected_graph(nodeArray)):
 			#Since the graph of Nodes is now connected let us generate visual representation of it and save it in node_connectivity_graph.png
-			generate_node_connectivity_graph(nodeArray, colors)
+			if drawGraph:
+				generate_node_connectivity_graph(nodeArray, colors, resultsDirectory)
 			break
 
-
-
+# Block only mode: no transactions are simulated and every node draws the sizes of its blocks from the blockSize distribution
+# (e.g. "uniform:1:1000", see BlockSizes in block.py), each node with its own stream
+def init_block_only(nodeArray, blockSize, streams):
+	for node in nodeArray:
+		node.blockSizes = BlockSizes(blockSize, streams.stream("blockSize", node.nodeID))
+
+# Batched transaction generation: every node creates its transactions in batches, one every interval milliseconds
+def init_transaction_batches(nodeArray, interval):
+	for node in nodeArray:
+		node.txnBatchInterval = interval
+
+# First passage propagation: the transactions reach every node at its first arrival time, computed with one shortest path
+# search per message (see propagation.py) instead of flooding the network with receive events
+def init_first_passage(nodeArray, streams):
+	propagation = FirstPassage(nodeArray, streams.stream("propagation"))
+	for node in nodeArray:
+		node.txnPropagation = propagation
+
+# Warm-start forking: every node continues with the random streams of another seed (same stream names as init_nodes)
+def reseed_nodes(nodeArray, streams):
+	propagation = streams.stream("propagation")
+	for node in nodeArray:
+		node.latencyPool.reseed(streams.stream("latency", node.nodeID))
+		node.powPool.reseed(streams.stream("pow", node.nodeID))
+		node.arrivalPool.reseed(streams.stream("arrivals", node.nodeID))
+		node.miningRNG = streams.stream("mining", node.nodeID)
+		node.workloadRNG = streams.stream("workload", node.nodeID)
+		if node.blockSizes is not None:
+			node.blockSizes.rng = streams.stream("blockSize", node.nodeID)
+		if node.txnPropagation is not None:
+			node.txnPropagation.rng = propagation
+
+# Warm-start forking: adversaries get the hash powers zeta_1 and zeta_2, the honest nodes share the rest equally (as in init_nodes)
+def set_hash_powers(nodeArray, zeta_1, zeta_2):
+	honestHashCPU = (1 - zeta_1 - zeta_2) / (len(nodeArray) - 2)
+	for node in nodeArray[:-2]:
+		node.hashPower = honestHashCPU
+	nodeArray[-2].hashPower = zeta_1
+	nodeArray[-1].hashPower = zeta_2
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+from records import count_blocks_in_chain
+from observers import chain_tip, reorg_depth
+import csv
+import numpy as np
+
+'''
+Time series of the chain metrics
+
+The collector follows the blocks with the observer hooks (see observers.py) and keeps running counters, so nothing is walked
+again when a sample is taken. Samples are taken every interval simulated milliseconds (the state between two blocks is the
+state after the last one) and once more at the end of the run. The counters start with the collector (e.g. at the time of the
+checkpoint when resuming), the published blocks and the main chain start from the block trees of the honest nodes. Columns of a sample:
+	time: Simulated time of the sample (milliseconds)
+	publishedBlocks: Blocks made public so far (mined by honest nodes, released or broadcast by attack nodes)
+	chainHeight: Depth of the main chain (deepest block accepted by an honest node, first seen on ties)
+	staleBlocks, staleRate: Published blocks out of the main chain, and their fraction of the published blocks
+	reorgs: Chain reorganizations of the honest nodes (one per node switching to another branch)
+	reorgsDepth1, reorgsDepth2, reorgsDepth3plus, maxReorgDepth: Distribution of the depths of these reorganizations
+	advX_privateLead: Length of the private chain of adversary X
+	advX_stateZeroDashTime: Simulated milliseconds spent by adversary X at state 0' so far
+	advX_mainChainShare: Fraction of the main chain mined by adversary X
+'''
+
+# Collector of the chain metrics of a simulation, sampled at fixed intervals of simulated time
+class MetricsCollector:
+	'''
+	interval: Simulated milliseconds between two samples
+	adversaries: NodeIDs of the two attack nodes
+	samples: Samples taken so far, one tuple per sample (same order as columns)
+	nextSample: Simulated time of the next sample
+	publishedBlocks: Hashes of the published blocks
+	tip: Tip of the main chain
+	nodeTips: Tip of the longest chain of each honest node (first seen block among the deepest ones), Structure = { nodeID : block }
+	adversaryBlocks: Blocks mined by each adversary in the chain ending at a block, Structure = { blockHash : (adv1 blocks, adv2 blocks) }
+	reorgDepths: Number of reorganizations of each depth, Structure = { depth : count }
+	privateLead: Length of the private chain of each attack node, Structure = { nodeID : length }
+	stateZeroDash: Time since when each attack node is at state 0' (None if not at state 0'), Structure = { nodeID : timestamp }
+	stateZeroDashTime: Simulated milliseconds spent at state 0' by each attack node (until the last state change), Structure = { nodeID : time }
+
+	'''
+	columns = ("time", "publishedBlocks", "chainHeight", "staleBlocks", "staleRate", "reorgs", "reorgsDepth1", "reorgsDepth2", "reorgsDepth3plus", "maxReorgDepth",
+		"adv1_privateLead", "adv1_stateZeroDashTime", "adv1_mainChainShare", "adv2_privateLead", "adv2_stateZeroDashTime", "adv2_mainChainShare")
+
+	# Collect the metrics of simulator from its current state (time series start at its current simulated time)
+	def __init__(self, simulator, interval):
+		nodeArray = simulator.nodeArray
+		currTime = simulator.currTime
+
+		self.interval = interval
+		self.adversaries = (nodeArray[-2].nodeID, nodeArray[-1].nodeID)
+		self.samples = []
+		self.nextSample = (currTime // interval + 1) * interval
+		self.adversaryBlocks = dict()
+		self.reorgDepths = dict()
+
+		# Blocks already published (e.g. when resuming) are the ones seen by the honest nodes
+		self.publishedBlocks = set()
+		self.tip = None
+		self.nodeTips = dict()
+		for node in nodeArray[:-2]:
+			for blockHash, blockInfo in node.blocksSeen.items():
+				if not blockInfo["Block"].isGenesis:
+					self.publishedBlocks.add(blockHash)
+				self.update_tip(blockInfo["Block"])
+			if node.blocksSeen:
+				self.nodeTips[node.nodeID] = chain_tip(node)
+
+		self.privateLead = { node.nodeID : len(node.privateChain) for node in nodeArray[-2:] }
+		self.stateZeroDash = { node.nodeID : (currTime if node.atStateZero_ else None) for node in nodeArray[-2:] }
+		self.stateZeroDashTime = { node.nodeID : 0 for node in nodeArray[-2:] }
+
+		simulator.observe("blockMined", self.block_mined)
+		simulator.observe("blockAccepted", self.block_accepted)
+		simulator.observe("privateBlockReleased", self.block_released)
+		simulator.observe("attackState", self.attack_state)
+
+	# Take the samples due before timestamp (the state did not change since the last block)
+	def advance(self, timestamp):
+		while self.nextSample < timestamp:
+			self.sample(self.nextSample)
+			self.nextSample += self.interval
+
+	# Add a sample of the current state at timestamp
+	def sample(self, timestamp):
+		chainHeight = self.tip.depth if self.tip is not None else 0
+		publishedBlocks = len(self.publishedBlocks)
+		staleBlocks = publishedBlocks - chainHeight
+		depths = self.reorgDepths
+
+		row = [timestamp, publishedBlocks, chainHeight, staleBlocks, staleBlocks / publishedBlocks if publishedBlocks else 0.0, sum(depths.values()),
+			depths.get(1, 0), depths.get(2, 0), sum(count for depth, count in depths.items() if depth >= 3), max(depths, default=0)]
+
+		mainChainBlocks = self.adversaryBlocks[self.tip.blockHash] if chainHeight else (0, 0)
+		for adversary, nodeID in enumerate(self.adversaries):
+			stateZeroDashTime = self.stateZeroDashTime[nodeID]
+			if self.stateZeroDash[nodeID] is not None:
+				stateZeroDashTime += timestamp - self.stateZeroDash[nodeID]
+			row.extend((self.privateLead[nodeID], stateZeroDashTime, mainChainBlocks[adversary] / chainHeight if chainHeight else 0.0))
+
+		self.samples.append(tuple(row))
+
+	# Blocks mined by each adversary in the chain ending at block (from the ones of its parent, walked only the first time)
+	def count_adversary_blocks(self, block):
+		if block.blockHash in self.adversaryBlocks:
+			return self.adversaryBlocks[block.blockHash]
+
+		if block.isGenesis:
+			counts = (0, 0)
+		elif block.previousBlock.blockHash in self.adversaryBlocks:
+			parentCounts = self.adversaryBlocks[block.previousBlock.blockHash]
+			miner = block.transactions[0].toNode
+			counts = tuple(count + (miner == nodeID) for count, nodeID in zip(parentCounts, self.adversaries))
+		else:
+			counts = tuple(count_blocks_in_chain(block, nodeID) for nodeID in self.adversaries)
+
+		self.adversaryBlocks[block.blockHash] = counts
+		return counts
+
+	# A block seen by an honest node becomes the tip of the main chain if it is deeper
+	def update_tip(self, block):
+		self.count_adversary_blocks(block)
+		if self.tip is None or block.depth > self.tip.depth:
+			self.tip = block
+
+	# A block added to the block tree of an honest node becomes the tip of its longest chain if it is deeper, the node switched
+	# to another branch if it does not extend the previous tip (same as the reorg hook, without looking for the tip every time)
+	def update_node_tip(self, nodeID, block):
+		self.update_tip(block)
+		nodeTip = self.nodeTips.get(nodeID)
+		if nodeTip is not None and block.depth <= nodeTip.depth:
+			return
+		self.nodeTips[nodeID] = block
+		if nodeTip is not None and block.previousBlock is not nodeTip:
+			depth = reorg_depth(nodeTip, block)
+			self.reorgDepths[depth] = self.reorgDepths.get(depth, 0) + 1
+
+	# blockMined hook: blocks mined by honest nodes and blocks broadcast by attack nodes at state 0' are published
+	def block_mined(self, payload):
+		self.advance(payload["timestamp"])
+		if payload["private"]:
+			return
+		self.publishedBlocks.add(payload["block"].blockHash)
+		if payload["nodeID"] not in self.adversaries:
+			self.update_node_tip(payload["nodeID"], payload["block"])
+
+	# blockAccepted hook: blocks accepted by honest nodes extend their longest chains and the main chain
+	def block_accepted(self, payload):
+		self.advance(payload["timestamp"])
+		if payload["nodeID"] not in self.adversaries:
+			self.update_node_tip(payload["nodeID"], payload["block"])
+
+	# privateBlockReleased hook
+	def block_released(self, payload):
+		self.advance(payload["timestamp"])
+		self.publishedBlocks.add(payload["block"].blockHash)
+
+	# attackState hook: private lead and time spent at state 0'
+	def attack_state(self, payload):
+		timestamp = payload["timestamp"]
+		nodeID = payload["nodeID"]
+		self.advance(timestamp)
+		self.privateLead[nodeID] = payload["privateBlocks"]
+
+		if self.stateZeroDash[nodeID] is not None and not payload["stateZeroDash"]:
+			self.stateZeroDashTime[nodeID] += timestamp - self.stateZeroDash[nodeID]
+			self.stateZeroDash[nodeID] = None
+		elif self.stateZeroDash[nodeID] is None and payload["stateZeroDash"]:
+			self.stateZeroDash[nodeID] = timestamp
+
+	# Take the last samples of a run ending at timestamp (one at timestamp itself)
+	def close(self, timestamp):
+		while self.nextSample <= timestamp:
+			self.sample(self.nextSample)
+			self.nextSample += self.interval
+		if not self.samples or self.samples[-1][0] != timestamp:
+			self.sample(timestamp)
+
+	# Samples as a NumPy structured array (one field per column)
+	def to_array(self):
+		dtype = [(column, "<f8" if column.endswith(("Rate", "Share")) else "<i8") for column in self.columns]
+		return np.array(self.samples, dtype=dtype)
+
+	# Write the samples to filename, ".npy" files hold the structured array of to_array, others are CSV
+	def write(self, filename):
+		if filename.endswith(".npy"):
+			np.save(filename, self.to_array())
+			return
+
+		with open(filename, 'w', newline='') as f:
+			writer = csv.writer(f)
+			writer.writerow(self.columns)
+			writer.writerows(self.samples)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+from bisect import bisect_right
+import itertools
+
+'''
+Global mining engine (Gillespie's direct method)
+
+With the per node engine every miner draws its own exponential POW time and has its own pending completion event.
+The POW completions of all the miners form a Poisson process of rate (sum of hashPower) / I, and each completion comes
+from miner i with probability hashPower_i / (sum of hashPower). The global engine samples this process directly: a single
+("mining", "race") event draws the time of the next completion in the whole network and the winner, then the winner's
+pending block (mined on its own tip, nodes may disagree on the tip) is completed at that time.
+
+Miners that are not mining when they win (e.g. between two blocks) find no block, which thins the process exactly as
+their missing rate would. The mining nodes only hold their pending completion (not scheduled), so the event queue keeps
+a single mining event whatever the number of nodes.
+'''
+
+# Mining races of the global mining engine
+class MiningRace:
+	'''
+	rng: Random number generator of the races (time of the next block and winner)
+	meanBlockTime: Mean time between two POW completions in the whole network (milliseconds)
+	cumulativeHashPower: Cumulative hash power of the nodes in NodeID order, Structure = [ hashPower of 0, hashPower of 0 and 1, ... ]
+
+	'''
+	def __init__(self, nodeArray, PoWI, rng):
+		self.rng = rng
+		self.cumulativeHashPower = list(itertools.accumulate(node.hashPower for node in nodeArray))
+		self.meanBlockTime = PoWI / self.cumulativeHashPower[-1]
+
+	# Time until the next POW completion in the network
+	def next_block_time(self):
+		return self.rng.exponential(self.meanBlockTime)
+
+	# NodeID of the miner of the next block, chosen in proportion to the hash powers
+	def pick_winner(self):
+		winner = bisect_right(self.cumulativeHashPower, self.rng.random() * self.cumulativeHashPower[-1])
+		return min(winner, len(self.cumulativeHashPower) - 1)
+
+	# Pending POW completion (broadcast or finished event, not scheduled yet) of a node, None if the node is not mining
+	@staticmethod
+	def pending_completion(node):
+		if node.status != "mining":
+			return None
+		if node.role == "honest":
+			completion = node.futureBroadCastEvent
+		else:
+			completion = node.futureEvents[0] if node.futureEvents else None
+
+		# A block already won at this timestamp (its completion is scheduled) cannot be won twice
+		return None if completion is None or completion.pending else completion
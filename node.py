@@ -2,8 +2,9 @@
 
 from block import Block
 from transactions import TXN
-import numpy as np
-import random
+from rng import VariatePool
+import heapq
+import sys
 
 # Class for Node
 class Node:
@@ -13,80 +14,126 @@ class Node:
 	hashPower: Node's fraction of the total hashing power.
 	PoWI: The interarrival time between blocks on average
 	T_Tx: The mean interarrival time between transactions
+	latencyPool: Pool of exponential variates for the queueing delays of the messages sent by this node
+	powPool: Pool of exponential variates for the POW times
+	arrivalPool: Pool of exponential variates for the time gaps between the transactions created by this node
+	miningRNG: Random number generator for block contents
+	workloadRNG: Random number generator for the transactions created by this node
+	miningEngine: How the POW completions of this node are drawn, possible engines: {"node" (own POW times), "global" (mining races, see mining.py)}
+	blockSizes: Distribution of the synthetic sizes of the blocks mined by this node in block only mode (see BlockSizes in block.py), None when transactions are simulated
+	txnBatchInterval: Time (milliseconds) between two batches of transactions created by this node, None when every transaction is created by its own event
+	txnPropagation: Shared first passage propagation of the transactions (see FirstPassage in propagation.py), None when transactions are flooded with receive events
+	observers: Shared observer hooks of the simulation (see Observers in observers.py), None when no observer is registered
+	linkConstants: Constant parts of the latency of each link, computed at first use, Structure = { Peer's NodeID : (propagation delay, link speed, mean queueing delay), ... }
 	status: Status of miner, possible status: {"free", "mining"}
 	cntSuccessfulBlocks: Count of successfully mined blocks created by this node in the block tree
 	blocksSeen: Dictionary of blocks present in the Node's Blockchain Tree, Structure = { BlockID (BlockHash): { "arrival_time": ~ , "Block": Block Object }, ... }
 	leafBlocks: Dictionary of blocks which are leaf nodes in the Node's Blockchain Tree, Structure = { BlockID (BlockHash): Block Object, ...}
 	peers: Contains information about the peers of the nodes, Structure = { Peer's NodeID : [ Peer's Node Object, propagation delay (rho_ij), link speed (c_ij) ], ... }
 	heardTXNs: Dictionary of all the Transactions which are heard by this node, Structure = { TXNID : TXN Object, ... }
+	pendingTXNs: Heap of the transactions on their way to this node with first passage propagation, Structure = [ (arrival time, TXNID, TXN Object), ... ]
 	depthOfMiningBlock: Depth of block that is currently getting mined (b/w creating and broadcast event)
-	futureBroadCastEvent: Broadcast Event ID is stored here, if the node is mining; This is necessary to cancel event if a block a received with greater depth (i.e shift to longest chain). 
+	futureBroadCastEvent: Broadcast Event (its cancellation handle) is stored here, if the node is mining; This is necessary to cancel event if a block a received with greater depth (i.e shift to longest chain). 
+	role: Role of the node used to dispatch events to their handlers ("honest")
 
 	'''
-	def __init__(self, nodeID, isSlow, hashPower, PoWI, T_Tx):
+	role = "honest"
+
+	def __init__(self, nodeID, isSlow, hashPower, PoWI, T_Tx, streams):
 
 		self.nodeID = nodeID
 		self.isSlow = isSlow
 		self.hashPower = hashPower
 		self.PoWI = PoWI
 		self.T_Tx = T_Tx
+		self.latencyPool = VariatePool(streams.stream("latency", nodeID))
+		self.powPool = VariatePool(streams.stream("pow", nodeID))
+		self.arrivalPool = VariatePool(streams.stream("arrivals", nodeID))
+		self.miningRNG = streams.stream("mining", nodeID)
+		self.workloadRNG = streams.stream("workload", nodeID)
+		self.miningEngine = "node"
+		self.blockSizes = None
+		self.txnBatchInterval = None
+		self.txnPropagation = None
+		self.observers = None
+		self.linkConstants = None
 		self.status = "free"
 		self.cntSuccessfulBlocks = 0
 		self.blocksSeen = dict()
 		self.leafBlocks = dict()
 		self.peers = dict()
 		self.heardTXNs = dict()
+		self.pendingTXNs = []
 		self.depthOfMiningBlock = -1
 		self.futureBroadCastEvent = None
 
 	# Calculating latency for transmitting a message to a connected peer
 	def calculate_latency(self, numberOfKBs, peerNodeID):
 
+		propagation_delay, link_speed, mean_queueing_delay = self.link_constants()[peerNodeID]
+
 		# Message Size in bits
 		messageSize = numberOfKBs * 8000
 
-		# Calculating various delays
-		propagation_delay = self.peers[peerNodeID][1]
-		link_speed = self.peers[peerNodeID][2]
-
-		# 96kbits = 96000
-		queueing_delay = np.random.exponential(scale=(96000 / link_speed))
-
 		# Total Latency
-		total_latency = propagation_delay + (messageSize / link_speed) + queueing_delay
+		total_latency = propagation_delay + (messageSize / link_speed) + self.latencyPool.exponential(mean_queueing_delay)
 		return total_latency
 
+	# Propagation delay, link speed and mean queueing delay of every link (computed at first use, once the peer graph is final)
+	def link_constants(self):
+		if self.linkConstants is None:
+			# 96kbits = 96000
+			self.linkConstants = { peerNodeID : (peer[1], peer[2], 96000 / peer[2]) for peerNodeID, peer in self.peers.items() }
+		return self.linkConstants
+
 	# Calculating next transaction time gap
 	def next_create_transaction_delay(self):
-		return np.random.exponential(scale=self.T_Tx)
+		return self.arrivalPool.exponential(self.T_Tx)
 
 	# Calculating POW time (T_k)
 	def calculate_POW_time(self):
 		if self.hashPower == 0:
-			return np.random.exponential(scale=(sys.maxsize))
-		return np.random.exponential(scale=(self.PoWI / self.hashPower))
+			return self.powPool.exponential(sys.maxsize)
+		return self.powPool.exponential(self.PoWI / self.hashPower)
 
 	# Create a random transaction with random amount
 	def create_transaction(self, nodeArray, timestamp):
 		# Choosing a random peer (can choose itself also, which is ok)
-		toNode = random.choice(nodeArray)
+		toNode = nodeArray[int(self.workloadRNG.integers(len(nodeArray)))]
 
 		# Random amount from 1 to 10 coins
-		amount = random.randint(1, 10)
+		amount = int(self.workloadRNG.integers(1, 11))
 
 		# Creating the TXN object
-		txn = TXN(timestamp, self.nodeID, toNode.nodeID, amount, False)
+		txn = TXN(timestamp, self.nodeID, toNode.nodeID, amount, False, self.workloadRNG)
 
 		# Adding in seen transactions
 		self.heardTXNs[txn.TXNID] = txn
 
 		return txn
 
+	# Create the random transactions of the last txnBatchInterval milliseconds: a Poisson number of them (mean txnBatchInterval / T_Tx),
+	# each with its own creation time, uniform in the interval (as the transactions of a Poisson process)
+	def create_transaction_batch(self, nodeArray, timestamp):
+		count = int(self.workloadRNG.poisson(self.txnBatchInterval / self.T_Tx))
+		creationTimes = sorted(round(timestamp - self.txnBatchInterval * u) for u in self.workloadRNG.random(count))
+		return [self.create_transaction(nodeArray, creationTime) for creationTime in creationTimes]
+
 	# Received a transaction from a peer
 	def receive_transaction(self, txn):
 		# Adding in seen transactions
 		self.heardTXNs[txn.TXNID] = txn
 
+	# Add the transactions arrived until timestamp (first passage propagation) to the heard transactions
+	def deliver_transactions(self, timestamp):
+		while self.pendingTXNs and self.pendingTXNs[0][0] <= timestamp:
+			txn = heapq.heappop(self.pendingTXNs)[2]
+			self.heardTXNs[txn.TXNID] = txn
+
+	# Block only mode: block holding the coinbase transaction only, with a synthetic size
+	def synthetic_block(self, timestamp, parentBlock):
+		return Block(timestamp, parentBlock, False, [TXN(timestamp, None, self.nodeID, 50, True, self.miningRNG)], self.blockSizes.draw())
+
 	# Verifying the transaction
 	def verify_txn(self, nodeBalance, txn):
 
@@ -106,6 +153,9 @@ class Node:
 	# Create Block
 	def create_block(self, timestamp, nodeArray):
 		
+		# Transactions arrived by now with first passage propagation
+		self.deliver_transactions(timestamp)
+
 		# Finding the Longest chain the Block Tree, Maximum depth leaf node, Arrival Time (To get first seen block)
 		longestChainLeaf = None
 		maxDepth = -1
@@ -113,7 +163,7 @@ class Node:
 
 		# To allow randomness in choosing 2 equal depth blocks (resolution of forks)
 		leafBlocksKeys = list(self.leafBlocks.keys()) 
-		random.shuffle(leafBlocksKeys)
+		self.miningRNG.shuffle(leafBlocksKeys)
 
 		for leafBlock in leafBlocksKeys:
 			if self.leafBlocks[leafBlock].depth > maxDepth or (self.leafBlocks[leafBlock].depth == maxDepth and self.blocksSeen[leafBlock]["arrival_time"] < arrivalTime):
@@ -121,20 +171,27 @@ class Node:
 				longestChainLeaf = self.leafBlocks[leafBlock]
 				arrivalTime = self.blocksSeen[leafBlock]["arrival_time"]
 
+		# Block only mode, no transactions to select
+		if self.blockSizes is not None:
+			block = self.synthetic_block(timestamp, longestChainLeaf)
+			self.status = "mining"
+			self.depthOfMiningBlock = block.depth
+			return block
+
 		# Getting transaction details about the longest chain
 		nodeBalance, transactionsInChain = self.get_details_chain(longestChainLeaf, nodeArray)
 
 		# Adding Randomness in TXN subset selection
 		heardTXNsKeys = list(self.heardTXNs.keys())
-		random.shuffle(heardTXNsKeys)
+		self.miningRNG.shuffle(heardTXNsKeys)
 
 		# Randomly selecting number of TXNs to added into the block, minimum = 0 transactions, maximum = min( number of transactions not included in any blocks in the longest chain, 999 ). 999 txns as 1MB max block size.
-		noOfTXNs = random.randint(0, min(len(heardTXNsKeys) - len(transactionsInChain), 999))
+		noOfTXNs = int(self.miningRNG.integers(0, min(len(heardTXNsKeys) - len(transactionsInChain), 999) + 1))
 		
 		transactions = []
 
 		# Adding the coinbase transaction, at 0th index
-		transactions.append(TXN(timestamp, None, self.nodeID, 50, True))
+		transactions.append(TXN(timestamp, None, self.nodeID, 50, True, self.miningRNG))
 		
 		cnt = 0
 		while(noOfTXNs and cnt < len(heardTXNsKeys)):
@@ -196,8 +253,9 @@ class Node:
 		if parentBlock.blockHash not in self.blocksSeen:
 			return False
 
-		# Getting transaction details about the parent block
-		nodeBalance, transactionsInChain = self.get_details_chain(parentBlock, nodeArray)
+		# Getting transaction details about the parent block (only needed when there are transactions other than the coinbase)
+		if len(block.transactions) > 1:
+			nodeBalance, transactionsInChain = self.get_details_chain(parentBlock, nodeArray)
 
 		# Validating the Transactions
 		for txn in block.transactions:
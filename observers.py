@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+from records import get_longest_chain_leaf
+
+'''
+Observer hooks of the simulation
+
+Callbacks registered for a hook (see Simulator.observe) are called with a dictionary payload every time the hook fires:
+	blockMined: A node completed the POW of a block and added it to its chain
+		{ "timestamp", "nodeID", "block", "private" (kept in the private chain of an attack node) }
+	blockAccepted: A node validated a block received from a peer and added it to its block tree
+		{ "timestamp", "nodeID", "block", "fromNode" }
+	reorg: The longest chain of an honest node switched to another branch
+		{ "timestamp", "nodeID", "oldTip", "newTip", "depth" (blocks of the old chain left out) }
+	privateBlockReleased: An attack node made a block of its private chain public and sent it to its peers
+		{ "timestamp", "nodeID", "block" }
+	txnCreated: A node created a transaction
+		{ "timestamp", "nodeID", "txn" }
+	attackState: An attack node mined or accepted a block, with its state afterwards
+		{ "timestamp", "nodeID", "privateBlocks" (length of the private chain), "stateZeroDash" (at state 0') }
+
+The handlers of event.py check the hook before building a payload or calling anything, so a hook without callbacks costs
+one attribute check (the nodes hold None when no observer is registered in the simulation).
+'''
+
+# Callbacks of the observer hooks, shared by all the nodes of a simulation
+class Observers:
+	'''
+	blockMined: Callbacks of the blockMined hook, None if there is none
+	blockAccepted: Callbacks of the blockAccepted hook, None if there is none
+	reorg: Callbacks of the reorg hook, None if there is none
+	privateBlockReleased: Callbacks of the privateBlockReleased hook, None if there is none
+	txnCreated: Callbacks of the txnCreated hook, None if there is none
+	attackState: Callbacks of the attackState hook, None if there is none
+
+	'''
+	hooks = ("blockMined", "blockAccepted", "reorg", "privateBlockReleased", "txnCreated", "attackState")
+
+	def __init__(self):
+		self.blockMined = None
+		self.blockAccepted = None
+		self.reorg = None
+		self.privateBlockReleased = None
+		self.txnCreated = None
+		self.attackState = None
+
+	# Register a callback for a hook
+	def register(self, hook, callback):
+		if hook not in self.hooks:
+			raise ValueError("Unknown hook " + str(hook) + ", available hooks: " + ", ".join(self.hooks))
+		if getattr(self, hook) is None:
+			setattr(self, hook, [])
+		getattr(self, hook).append(callback)
+
+	# Call the callbacks of a hook
+	def notify(self, hook, payload):
+		for callback in getattr(self, hook):
+			callback(payload)
+
+# Tip of the longest chain of an honest node (first seen block among the deepest leaves)
+def chain_tip(node):
+	return get_longest_chain_leaf({ blockHash : node.blocksSeen[blockHash] for blockHash in node.leafBlocks })
+
+# Number of blocks of the chain ending at oldTip that are not in the chain ending at newTip
+def reorg_depth(oldTip, newTip):
+	oldBlock, newBlock = oldTip, newTip
+	while newBlock.depth > oldBlock.depth:
+		newBlock = newBlock.previousBlock
+	while oldBlock.depth > newBlock.depth:
+		oldBlock = oldBlock.previousBlock
+	while oldBlock is not newBlock:
+		oldBlock = oldBlock.previousBlock
+		newBlock = newBlock.previousBlock
+	return oldTip.depth - oldBlock.depth
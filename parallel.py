@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+from multiprocessing import Process, Pipe
+from initialize import init_nodes, init_block_only, init_transaction_batches
+from checkpoint import block_state, restore_block, dump_nodes, load_nodes
+from event import Event
+from scheduler import schedulers
+from rng import RandomStreams
+from block import Block
+import contextlib
+import collections
+import math
+import time
+import io
+
+'''
+Conservative parallel discrete event simulation
+
+The peer graph is split in partitions, each one simulated by a worker process with its own event queue. Only the
+("receive", ...) events sent along a link between two partitions cross processes, and every link has a propagation delay
+of at least 10 milliseconds (assign_edge in utils.py), so an event executed at time t cannot create an event in another
+partition before t + lookahead, where lookahead is the smallest propagation delay of the cut links.
+The workers therefore execute all their events in [T, T + lookahead) independently, then exchange the events sent to
+the other partitions, and the next window starts at the earliest pending event of all the workers.
+
+Ties on timestamp are broken by per node sequence numbers (see scheduler.py) and every node has its own random
+number streams, so a run gives the same results as the sequential engine for the same seed.
+
+The maxEventLoop budget is shared between the workers at every window, so the run stops after exactly maxEventLoop
+events. A worker that used its share stops before the end of the window, which keeps the run conservative, but the
+other workers may then have executed later events in place of its remaining ones: when maxEventLoop ends the run, the
+executed events (and the results) differ from the sequential engine. Runs ended by stopTime are the same.
+
+Every worker builds the whole network from the seed, executes the genesis event, and keeps the events of its nodes only.
+Blocks are sent as attributes (see checkpoint.py) along with the ancestors the destination partition may not have yet.
+'''
+
+# Split the nodes in nParts partitions of consecutive nodes in breadth first order (neighbours tend to share a partition)
+def partition_nodes(nodeArray, nParts):
+	order = []
+	visited = set()
+	for root in range(len(nodeArray)):
+		if root in visited:
+			continue
+		visited.add(root)
+		queue = collections.deque([root])
+		while queue:
+			nodeID = queue.popleft()
+			order.append(nodeID)
+			for peerID in sorted(nodeArray[nodeID].peers):
+				if peerID not in visited:
+					visited.add(peerID)
+					queue.append(peerID)
+
+	owner = [0] * len(nodeArray)
+	for position, nodeID in enumerate(order):
+		owner[nodeID] = position * nParts // len(order)
+	return owner
+
+# Smallest latency (milliseconds, rounded down) of the links between two partitions, None if there is no such link
+def compute_lookahead(nodeArray, owner):
+	delays = [peer[1] for node in nodeArray for peerID, peer in node.peers.items() if owner[node.nodeID] != owner[peerID]]
+	return int(math.floor(min(delays))) if delays else None
+
+# Simulation of the nodes of one partition
+class PartitionWorker:
+	'''
+	part: Index of the partition simulated by this worker
+	owner: Partition of each node, Structure = [ partition of NodeID 0, partition of NodeID 1, ... ]
+	nodeArray: The whole network, only the nodes of this partition are simulated
+	eventQueue: Events of the nodes of this partition
+	blocks: Blocks known by this worker (created here, sent or received), Structure = { BlockHash : Block Object, ... }
+	knownBy: Hashes of the blocks that each partition is known to have, Structure = { partition : set of BlockHashes, ... }
+	outbox: Events sent to the other partitions during the current window, Structure = { partition : [ message, ... ], ... }
+
+	A message is (timestamp, sequence number, createdBy, executedBy, eventType, payload) where payload is the TXN object (list of TXN objects for a batch),
+	or (BlockHash, [ attributes of the blocks unknown to the destination, parents first ]) for a block.
+
+	'''
+	def __init__(self, part, owner, nodeArray, eventQueue):
+		self.part = part
+		self.owner = owner
+		self.nodeArray = nodeArray
+		self.eventQueue = eventQueue
+		self.blocks = dict()
+		self.knownBy = { other : set() for other in set(owner) if other != part }
+		self.outbox = { other : [] for other in self.knownBy }
+
+	# Execute the genesis event (in every worker, so that every copy of the network has the genesis block)
+	def genesis(self, genesisRNG):
+		genesisEvent = Event(0, None, None, genesisRNG, ("genesis",))
+		self.eventQueue.next_sequence(None)
+		futureEvents, _, _ = genesisEvent.execute(self.nodeArray)
+
+		# Every worker creates the first events of all the nodes, the other partitions schedule their own ones
+		for futureEvent in futureEvents:
+			sequence = self.eventQueue.next_sequence(futureEvent.createdBy)
+			if self.owner[futureEvent.executedBy] == self.part:
+				self.eventQueue.insert(futureEvent, sequence)
+
+		genesisBlock = next(iter(self.nodeArray[0].leafBlocks.values()))
+		self.blocks[genesisBlock.blockHash] = genesisBlock
+		for known in self.knownBy.values():
+			known.add(genesisBlock.blockHash)
+
+	# Schedule the events of this partition and send the others, sequence numbers are given in creation order
+	def schedule(self, futureEvents):
+		for futureEvent in futureEvents:
+			sequence = self.eventQueue.next_sequence(futureEvent.createdBy)
+			destination = self.owner[futureEvent.executedBy]
+			if destination == self.part:
+				self.eventQueue.insert(futureEvent, sequence)
+			else:
+				self.outbox[destination].append(self.message(futureEvent, sequence, destination))
+
+	# Message carrying an event to another partition
+	def message(self, futureEvent, sequence, destination):
+		payload = futureEvent.eventObject
+		if isinstance(payload, Block):
+			known = self.knownBy[destination]
+			chain = []
+			block = payload
+			while block.blockHash not in known:
+				known.add(block.blockHash)
+				self.blocks[block.blockHash] = block
+				chain.append(block_state(block))
+				block = block.previousBlock
+			chain.reverse()
+			payload = (payload.blockHash, chain)
+
+		return (futureEvent.timestamp, sequence, futureEvent.createdBy, futureEvent.executedBy, futureEvent.eventType, payload)
+
+	# Schedule the events received from the other partitions
+	def deliver(self, messages):
+		for timestamp, sequence, createdBy, executedBy, eventType, payload in messages:
+			if eventType[1] == "block":
+				blockHash, chain = payload
+				known = self.knownBy[self.owner[createdBy]]
+				for blockState in chain:
+					if blockState["blockHash"] not in self.blocks:
+						self.blocks[blockState["blockHash"]] = restore_block(blockState, self.blocks)
+					known.add(blockState["blockHash"])
+				payload = self.blocks[blockHash]
+
+			self.eventQueue.insert(Event(timestamp, createdBy, executedBy, payload, eventType), sequence)
+
+	# Execute the events before end (at most limit of them), returns (number of executed events, timestamp of the last one, outbox)
+	def run_window(self, end, limit):
+		cnt = 0
+		currTime = None
+		eventQueue = self.eventQueue
+		nodeArray = self.nodeArray
+
+		while cnt < limit:
+			currEvent = eventQueue.peek()
+			if currEvent is None or currEvent.timestamp >= end:
+				break
+			eventQueue.pop()
+			currTime = currEvent.timestamp
+
+			futureEvents, cancelledEvents, outcome = currEvent.execute(nodeArray)
+			self.schedule(futureEvents)
+			for cancelledEvent in cancelledEvents:
+				eventQueue.cancel(cancelledEvent)
+
+			cnt += 1
+
+		outbox = self.outbox
+		self.outbox = { other : [] for other in self.knownBy }
+		return cnt, currTime, outbox
+
+	# Timestamp of the next event of this partition, None if there is none
+	def next_timestamp(self):
+		nextEvent = self.eventQueue.peek()
+		return None if nextEvent is None else nextEvent.timestamp
+
+# Worker process: builds the network, then answers the commands of the coordinator
+def worker_process(connection, part, owner, parameters, scheduler):
+	nodes, zeta_1, zeta_2, I, T_Tx, seed, blockSize, txnBatch = parameters
+	streams = RandomStreams(seed)
+
+	with contextlib.redirect_stdout(io.StringIO()):
+		nodeArray = init_nodes(nodes, zeta_1, zeta_2, I, T_Tx, None, streams, False, False)
+	if blockSize is not None:
+		init_block_only(nodeArray, blockSize, streams)
+	if txnBatch is not None:
+		init_transaction_batches(nodeArray, txnBatch)
+
+	worker = PartitionWorker(part, owner, nodeArray, schedulers[scheduler]())
+	worker.genesis(streams.stream("genesis"))
+	connection.send(worker.next_timestamp())
+
+	while True:
+		command = connection.recv()
+
+		if command[0] == "window":
+			_, end, limit, messages = command
+			worker.deliver(messages)
+			cnt, currTime, outbox = worker.run_window(end, limit)
+			connection.send((cnt, currTime, outbox, worker.next_timestamp()))
+
+		elif command[0] == "finish":
+			connection.send(dump_nodes([node for node in nodeArray if owner[node.nodeID] == part]))
+			connection.close()
+			return
+
+# Run the simulation on nParts worker processes until stopTime, maxEventLoop events (budget shared between the workers at every window) or wallTime seconds (checked between windows)
+# The partition with the earliest pending event gets the rounding remainder of the event budget, so that every window makes progress
+# Returns the node array with the final state of every node, the number of executed events, the last timestamp and the reason for stopping
+def run_parallel(nodeArray, nParts, parameters, scheduler, stopConditions, tracer):
+	owner = partition_nodes(nodeArray, nParts)
+	lookahead = compute_lookahead(nodeArray, owner)
+	stopTime = stopConditions.stopTime
+
+	# Without cut links partitions never interact, a single window up to stopTime is enough
+	window = stopTime + 1 if lookahead is None else lookahead
+
+	print("Parallel engine: " + str(nParts) + " partitions of " + ", ".join(str(owner.count(part)) for part in range(nParts)) + " nodes, lookahead " + str(lookahead) + " milliseconds")
+
+	connections = []
+	processes = []
+	for part in range(nParts):
+		connection, workerConnection = Pipe()
+		process = Process(target=worker_process, args=(workerConnection, part, owner, parameters, scheduler))
+		process.start()
+		connections.append(connection)
+		processes.append(process)
+
+	# The genesis event is executed by every worker but counted once
+	nextTimestamps = [connection.recv() for connection in connections]
+	inbound = [[] for _ in range(nParts)]
+	cnt = 1
+	currTime = 0
+	reason = None
+
+	while reason is None:
+		# Earliest pending event of every partition, in its event queue or in the events sent to it
+		pending = []
+		for part in range(nParts):
+			timestamps = [message[0] for message in inbound[part]]
+			if nextTimestamps[part] is not None:
+				timestamps.append(nextTimestamps[part])
+			pending.append(min(timestamps) if timestamps else None)
+		if all(timestamp is None for timestamp in pending):
+			reason = "event queue is empty"
+			break
+
+		start = min(timestamp for timestamp in pending if timestamp is not None)
+		if start > stopTime:
+			reason = "reached simulated time " + str(stopTime) + " milliseconds"
+			break
+		if cnt >= stopConditions.maxEventLoop:
+			reason = "executed maxEventLoop (" + str(stopConditions.maxEventLoop) + ") events"
+			break
+		if stopConditions.wallTime is not None and time.time() - stopConditions.startWallTime >= stopConditions.wallTime:
+			reason = "wall clock budget of " + str(stopConditions.wallTime) + " seconds is over"
+			break
+
+		end = min(start + window, stopTime + 1)
+		remaining = stopConditions.maxEventLoop - cnt
+		limits = [remaining // nParts] * nParts
+		limits[pending.index(start)] += remaining % nParts
+		for part, connection in enumerate(connections):
+			connection.send(("window", end, limits[part], inbound[part]))
+
+		inbound = [[] for _ in range(nParts)]
+		for part, connection in enumerate(connections):
+			cntWindow, lastTimestamp, outbox, nextTimestamps[part] = connection.recv()
+			cnt += cntWindow
+			if lastTimestamp is not None:
+				currTime = max(currTime, lastTimestamp)
+			for destination, messages in outbox.items():
+				inbound[destination].extend(messages)
+
+		tracer.progress(cnt, currTime, stopConditions)
+
+	for connection in connections:
+		connection.send(("finish",))
+	nodeArray = load_nodes([connection.recv() for connection in connections])
+	for process in processes:
+		process.join()
+
+	return nodeArray, cnt, currTime, reason
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+from contextlib import contextmanager
+from event import Event, dispatchTable
+from node import Node
+from attack import AttackNode
+import cProfile
+import pstats
+import time
+import os
+
+'''
+Wall time accounting of the event loop
+
+A simulation with statistics executes its events through a timed copy of the dispatch table (EventStats.dispatch_table),
+the classes are never modified, so other simulations of the process run the plain methods. While an event is executed, the
+event and its executing node are switched to timed subclasses (same slots, main methods timed) and switched back afterwards.
+The time between two events is the one of the event loop itself (event queue operations and stop conditions), and the
+cancellations are counted from the events returned by the handlers, so the queue is not timed call by call.
+
+Times are inclusive (validate_block includes get_details_chain) and kept in histograms of 4 buckets per power of 2 nanoseconds,
+percentiles and maxima are upper bounds within 25%. A timed call costs two clock reads and a few additions (inlined, 1 to 2
+microseconds per event in all); methods cheaper than that (e.g. receive_transaction) are not timed, their time is in the one
+of their event.
+
+Profiles of the phases of a run (Profiler): the event loop (or a window of its events) and the report are profiled with
+cProfile, each phase gives a pstats file (python3 -m pstats FILE) and collapsed stacks (one "caller;...;function microseconds"
+line per stack, e.g. for flamegraph.pl or speedscope). cProfile only measures the time of every caller -> function edge, so
+the stacks are rebuilt from the call graph: the time of a function is split between the stacks of its callers in proportion
+to the time of these edges.
+'''
+
+# Timed methods of each class (the main steps of the event handlers)
+timedMethods = (
+	(Event, ("fan_out", "send_transactions", "start_mining")),
+	(Node, ("create_transaction", "create_transaction_batch", "create_block", "broadcast_block", "validate_block", "get_details_chain")),
+	(AttackNode, ("create_transaction", "create_transaction_batch", "create_block", "create_block_at_state_zero_dash", "broadcast_block_at_state_zero_dash",
+		"finished_block", "validate_block", "get_details_chain")),
+)
+
+# Percentiles of the summary table
+percentiles = (50, 90, 99)
+
+# Number of histogram buckets (durations up to 2^64 nanoseconds)
+cntBuckets = 65 << 2
+
+# Histogram bucket of a duration in nanoseconds: 4 buckets per power of 2 (first 3 bits of the duration), inlined in the timed methods
+def bucket_index(ns):
+	bits = ns.bit_length()
+	return (bits << 2) | ((ns >> (bits - 3)) & 3) if bits > 3 else bits << 2
+
+# Largest duration (nanoseconds) of a histogram bucket
+def bucket_bound(index):
+	bits, sub = index >> 2, index & 3
+	return (5 + sub) << (bits - 3) if bits > 3 else 1 << bits
+
+# Total duration (nanoseconds) and histogram of the durations of the calls of a timed function
+class Timing:
+	'''
+	total: Total duration of the calls (nanoseconds)
+	buckets: Number of calls in each histogram bucket (indexed by bucket_index)
+
+	'''
+	__slots__ = ("total", "buckets")
+
+	def __init__(self):
+		self.total = 0
+		self.buckets = [0] * cntBuckets
+
+	# Number of calls
+	@property
+	def count(self):
+		return sum(self.buckets)
+
+	# Upper bound of the duration of the calls at the given percentile (nanoseconds), 100 gives the maximum
+	def percentile(self, percent):
+		rank = percent / 100 * self.count
+		cumulative = 0
+		for index, count in enumerate(self.buckets):
+			cumulative += count
+			if count and cumulative >= rank:
+				return bucket_bound(index)
+		return 0
+
+# Counts and wall time of the event types, node methods and event queue of a simulation
+class EventStats:
+	'''
+	events: Timing of every event type, Structure = { (role, eventType) : Timing }
+	methods: Timing of every timed method (and of the event loop between two events), Structure = { "Class.method" : Timing }
+	cntTombstones: Number of cancelled events skipped when dequeued (the others are removed by compactions)
+	cntCancelled: Number of events cancelled (cancelling an executed or cancelled event does not count)
+	queueLength: Sum and maximum of the number of live events in the queue at every event, Structure = [ sum, maximum ]
+	timedClasses: Subclass with timed methods of every class of timedMethods, Structure = { class : timed subclass }
+	lastEnd: Clock (nanoseconds) at the end of the last event, Structure = [ clock ]
+
+	'''
+	def __init__(self):
+		self.events = dict()
+		self.methods = dict()
+		self.cntTombstones = 0
+		self.cntCancelled = 0
+		self.queueLength = [0, 0]
+		self.timedClasses = { cls : type("Timed" + cls.__name__, (cls,), self.timed_methods(cls, names)) for cls, names in timedMethods }
+		self.lastEnd = [time.perf_counter_ns()]
+
+	# Class attributes of the timed subclass of cls (slotted classes keep their slots, so that instances can switch class)
+	def timed_methods(self, cls, names):
+		attributes = { name : self.timed(cls.__name__ + "." + name, getattr(cls, name)) for name in names }
+		if "__slots__" in cls.__dict__:
+			attributes["__slots__"] = ()
+		return attributes
+
+	# Timed version of a method, its calls are added to the Timing of name
+	def timed(self, name, method):
+		timing = self.methods.setdefault(name, Timing())
+		buckets = timing.buckets
+		clock = time.perf_counter_ns
+
+		def timed_method(*args, **kwargs):
+			start = clock()
+			result = method(*args, **kwargs)
+			ns = clock() - start
+			timing.total += ns
+			bits = ns.bit_length()
+			buckets[(bits << 2) | ((ns >> (bits - 3)) & 3) if bits > 3 else bits << 2] += 1
+			return result
+
+		return timed_method
+
+	# Timed copy of the dispatch table of event.py: the time of every event type and of the event loop before it, the length
+	# of eventQueue, the cancelled events and the timed methods of the event and of its executing node
+	def dispatch_table(self, eventQueue):
+		clock = time.perf_counter_ns
+		events = self.events
+		loopTiming = self.methods.setdefault("Event loop (queue, stop conditions)", Timing())
+		loopBuckets = loopTiming.buckets
+		queueLength = self.queueLength
+		lastEnd = self.lastEnd
+		timedEvent = self.timedClasses[Event]
+		stats = self
+
+		def timed_handler(key, handler):
+			nodeClass = Node if key[0] == "honest" else AttackNode
+			timedNode = self.timedClasses[nodeClass]
+			timing = events.setdefault(key, Timing())
+			buckets = timing.buckets
+
+			def handle(event, nodeArray):
+				start = clock()
+				ns = start - lastEnd[0]
+				loopTiming.total += ns
+				bits = ns.bit_length()
+				loopBuckets[(bits << 2) | ((ns >> (bits - 3)) & 3) if bits > 3 else bits << 2] += 1
+				length = eventQueue.cntQueued - eventQueue.cntCancelled
+				queueLength[0] += length
+				if length > queueLength[1]:
+					queueLength[1] = length
+
+				# Genesis and mining race events are executed by no node
+				node = None if event.executedBy is None else nodeArray[event.executedBy]
+				event.__class__ = timedEvent
+				if node is not None:
+					node.__class__ = timedNode
+				try:
+					result = handler(event, nodeArray)
+				finally:
+					event.__class__ = Event
+					if node is not None:
+						node.__class__ = nodeClass
+
+				# Cancelled by the event loop next, executed and already cancelled events are left out by EventQueue.cancel
+				for handle in result[1]:
+					if handle is not None and handle.pending and not handle.cancelled:
+						stats.cntCancelled += 1
+
+				end = lastEnd[0] = clock()
+				ns = end - start
+				timing.total += ns
+				bits = ns.bit_length()
+				buckets[(bits << 2) | ((ns >> (bits - 3)) & 3) if bits > 3 else bits << 2] += 1
+				return result
+
+			return handle
+
+		return { key : timed_handler(key, handler) for key, handler in dispatchTable.items() }
+
+	# Count the tombstones dequeued by eventQueue within the block, the time before the first event is not the event loop's
+	@contextmanager
+	def timing(self, eventQueue):
+		cntSkipped = eventQueue.cntSkipped
+		self.lastEnd[0] = time.perf_counter_ns()
+		try:
+			yield self
+		finally:
+			self.cntTombstones += eventQueue.cntSkipped - cntSkipped
+
+	# Number of executed events
+	def events_executed(self):
+		return sum(timing.count for timing in self.events.values())
+
+	# Statistics as a dictionary (durations in microseconds), e.g. for a JSON file
+	def to_dict(self):
+		def timing_dict(timing):
+			count = timing.count
+			values = { "count": count, "total": timing.total / 1000, "mean": timing.total / count / 1000 }
+			for percent in percentiles:
+				values["p" + str(percent)] = timing.percentile(percent) / 1000
+			values["max"] = timing.percentile(100) / 1000
+			return values
+
+		executed = self.events_executed()
+		dequeued = executed + self.cntTombstones
+		return {
+			"events": { role + " " + " ".join(eventType) : timing_dict(timing) for (role, eventType), timing in self.events.items() if timing.count },
+			"methods": { name : timing_dict(timing) for name, timing in self.methods.items() if timing.count },
+			"queue": {
+				"dequeued": dequeued,
+				"cancelled": self.cntCancelled,
+				"tombstones": self.cntTombstones,
+				"tombstoneHitRate": self.cntTombstones / dequeued if dequeued else None,
+				"meanLength": self.queueLength[0] / executed if executed else None,
+				"maxLength": self.queueLength[1],
+			},
+		}
+
+	# Summary table of the statistics, shares are fractions of wallTime (seconds spent in the event loop)
+	def table(self, wallTime):
+		stats = self.to_dict()
+		columns = "{:<48} {:>10} {:>10} {:>7} {:>10}" + " {:>10}" * (len(percentiles) + 1)
+		header = columns.format("", "count", "total (s)", "share", "mean (us)", *("p" + str(percent) + " (us)" for percent in percentiles), "max (us)")
+		lines = []
+
+		for title, rows in (("Event type", stats["events"]), ("Method", stats["methods"])):
+			lines.append(title)
+			lines.append(header)
+			for name, values in sorted(rows.items(), key=lambda row: -row[1]["total"]):
+				share = values["total"] / 1e6 / wallTime if wallTime else 0
+				lines.append(columns.format(name, values["count"], "{:.3f}".format(values["total"] / 1e6), "{:.1%}".format(share), "{:.1f}".format(values["mean"]),
+					*("{:.1f}".format(values["p" + str(percent)]) for percent in percentiles), "{:.1f}".format(values["max"])))
+			lines.append("")
+
+		queue = stats["queue"]
+		lines.append("Event queue: " + str(queue["dequeued"]) + " entries dequeued, " + str(queue["cancelled"]) + " events cancelled, " + str(queue["tombstones"])
+			+ " cancelled events dequeued (hit rate " + ("-" if queue["tombstoneHitRate"] is None else "{:.2%}".format(queue["tombstoneHitRate"])) + ")"
+			+ ", length mean " + ("-" if queue["meanLength"] is None else "{:.1f}".format(queue["meanLength"])) + " / max " + str(queue["maxLength"]))
+
+		return "\n".join(lines)
+
+# Name of a function of a pstats profile in the collapsed stacks
+def frame_name(function):
+	filename, line, name = function
+	if filename == "~":
+		return name.replace(";", ",")
+	return (os.path.basename(filename) + ":" + name).replace(";", ",")
+
+# Collapsed stacks of a pstats profile, Structure = { "caller;...;function" : own time in microseconds }
+# Stacks below minimum microseconds are left out (recursive calls are cut at their first repetition)
+def collapsed_stacks(stats, minimum=1):
+	callees = dict()
+	for function, (cc, nc, tt, ct, callers) in stats.items():
+		for caller, edge in callers.items():
+			callees.setdefault(caller, []).append((function, edge[3]))
+
+	stacks = dict()
+
+	# Visit function with the fraction of its calls made from stack
+	def visit(function, stack, fraction):
+		tt, ct = stats[function][2], stats[function][3]
+		stack = stack + (function,)
+		ownTime = tt * fraction * 1e6
+		if ownTime >= minimum:
+			key = ";".join(frame_name(frame) for frame in stack)
+			stacks[key] = stacks.get(key, 0) + ownTime
+		for callee, edgeTime in callees.get(function, ()):
+			calleeTime = stats[callee][3]
+			if callee in stack or not calleeTime or edgeTime * fraction * 1e6 < minimum:
+				continue
+			visit(callee, stack, fraction * min(1, edgeTime / calleeTime))
+
+	for function, (cc, nc, tt, ct, callers) in stats.items():
+		if not callers:
+			visit(function, (), 1)
+
+	return { stack : round(duration) for stack, duration in stacks.items() if round(duration) }
+
+# cProfile profiles of the phases of a simulation ("eventLoop" and "report"), written to a directory
+class Profiler:
+	'''
+	directory: Directory of the profile files (PHASE.pstats and PHASE.collapsed for every phase)
+	firstEvent: Number of the first profiled event of the event loop
+	lastEvent: Number of the event after the last profiled one, None to profile until the end
+	profiles: cProfile profile of every phase, Structure = { phase : cProfile.Profile }
+
+	'''
+	def __init__(self, directory, window=None):
+		self.directory = directory
+		self.firstEvent, self.lastEvent = parse_window(window)
+		self.profiles = dict()
+
+	# Profile the block as a part of phase
+	@contextmanager
+	def profiling(self, phase):
+		profile = self.profiles.setdefault(phase, cProfile.Profile())
+		profile.enable()
+		try:
+			yield profile
+		finally:
+			profile.disable()
+
+	# Split the events start, ..., end - 1 in runs of events outside or inside the profiled window, Structure = [ (first event, last event + 1, profiled), ... ]
+	def segments(self, start, end):
+		bounds = sorted({ start, end } | { bound for bound in (self.firstEvent, self.lastEvent) if bound is not None and start < bound < end })
+		return [ (first, last, first >= self.firstEvent and (self.lastEvent is None or first < self.lastEvent)) for first, last in zip(bounds, bounds[1:]) ]
+
+	# Write the pstats file and the collapsed stacks of every phase, returns the names of the files
+	def write(self):
+		os.makedirs(self.directory, exist_ok=True)
+		files = []
+		for phase, profile in self.profiles.items():
+			statsFile = os.path.join(self.directory, phase + ".pstats")
+			profile.dump_stats(statsFile)
+			stacksFile = os.path.join(self.directory, phase + ".collapsed")
+			with open(stacksFile, 'w') as f:
+				for stack, duration in sorted(collapsed_stacks(pstats.Stats(profile).stats).items()):
+					f.write(stack + " " + str(duration) + "\n")
+			files.extend((statsFile, stacksFile))
+		return files
+
+# First and last + 1 event numbers of a window "FIRST:LAST" (either can be left out, e.g. "1000000:"), raises ValueError if incorrect
+def parse_window(window):
+	if window is None:
+		return 0, None
+	first, separator, last = window.partition(":")
+	try:
+		firstEvent = int(first) if first else 0
+		lastEvent = int(last) if last else None
+	except ValueError:
+		firstEvent = lastEvent = -1
+	if not separator or firstEvent < 0 or (lastEvent is not None and lastEvent <= firstEvent):
+		raise ValueError("Incorrect window of profiled events " + window + ", expected FIRST:LAST event numbers (e.g. 1000000:1100000)!!!!")
+	return firstEvent, lastEvent
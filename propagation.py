@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import heapq
+import numpy as np
+
+'''
+First passage propagation of transactions
+
+Flooding a message hop by hop creates one ("receive", ...) event per link and direction, most of them "Already Heard!", while
+all that matters for a transaction is the time at which every node hears it first. With the queueing delays of all the links
+drawn when the message is sent, these first arrival times are the shortest paths from the sender in the peer graph, where the
+length of a link is the latency of the message on it (rounded to milliseconds at every hop, as with events), so a single
+Dijkstra gives them. Every node then gets the transaction in its pending transactions and adds it to its heard transactions
+when it needs them (before creating a block, see deliver_transactions in node.py).
+
+Unlike flooding with events, a node that already knows a transaction from a block still relays it.
+'''
+
+# Shortest path propagation of the messages of a peer graph
+class FirstPassage:
+	'''
+	rng: Random number generator of the queueing delays
+	offsets: The links from node u are offsets[u], ..., offsets[u+1] - 1, Structure = [ 0, degree of node 0, ... ]
+	targets: NodeID of the destination of every link (in both directions)
+	propagationDelays: Propagation delay (rho) of every link
+	transmissionDelays: Transmission delay of one KB (8000 / link speed) on every link
+	meanQueueingDelays: Mean queueing delay (96000 / link speed) of every link
+
+	'''
+	def __init__(self, nodeArray, rng):
+		self.rng = rng
+		self.offsets = [0]
+		targets = []
+		links = []
+		for node in nodeArray:
+			for peerID, (propagation_delay, link_speed, mean_queueing_delay) in node.link_constants().items():
+				targets.append(peerID)
+				links.append((propagation_delay, 8000 / link_speed, mean_queueing_delay))
+			self.offsets.append(len(targets))
+
+		self.targets = targets
+		self.propagationDelays, self.transmissionDelays, self.meanQueueingDelays = (np.array(column) for column in zip(*links))
+
+	# First arrival time at every node of a message of numberOfKBs sent by source at timestamp
+	def arrival_times(self, source, numberOfKBs, timestamp):
+		queueingDelays = self.rng.standard_exponential(len(self.targets))
+		latencies = np.rint(self.propagationDelays + numberOfKBs * self.transmissionDelays + self.meanQueueingDelays * queueingDelays).astype(np.int64).tolist()
+
+		offsets = self.offsets
+		targets = self.targets
+		arrivals = [None] * (len(offsets) - 1)
+		arrivals[source] = timestamp
+		heap = [(timestamp, source)]
+
+		while heap:
+			arrival, nodeID = heapq.heappop(heap)
+			if arrival > arrivals[nodeID]:
+				continue
+			for link in range(offsets[nodeID], offsets[nodeID + 1]):
+				peerID = targets[link]
+				peerArrival = arrival + latencies[link]
+				if arrivals[peerID] is None or peerArrival < arrivals[peerID]:
+					arrivals[peerID] = peerArrival
+					heapq.heappush(heap, (peerArrival, peerID))
+
+		return arrivals
+
+	# Send transactions created by source at timestamp (as one message of 1 KB per transaction) to all the other nodes
+	def propagate(self, nodeArray, source, txns, timestamp):
+		for nodeID, arrival in enumerate(self.arrival_times(source, len(txns), timestamp)):
+			if nodeID == source or arrival is None:
+				continue
+			pendingTXNs = nodeArray[nodeID].pendingTXNs
+			for txn in txns:
+				heapq.heappush(pendingTXNs, (arrival, txn.TXNID, txn))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+# Get the longest chain leaf (first seen block among the deepest ones) and the number of blocks of a block tree
+def get_longest_chain_leaf(blockTree):
+	longestChainLeaf = None
+	maxDepth = -1
+	arrivalTime = None
+
+	for blockInfo in blockTree.values():
+		if blockInfo["Block"].depth > maxDepth or (blockInfo["Block"].depth == maxDepth and blockInfo["arrival_time"] < arrivalTime):
+			maxDepth = blockInfo["Block"].depth
+			longestChainLeaf = blockInfo["Block"]
+			arrivalTime = blockInfo["arrival_time"]
+
+	return longestChainLeaf
+
+# Count the blocks mined by a node in the chain ending at block (only the blocks created at or after warmup)
+def count_blocks_in_chain(block, nodeID, warmup=0):
+	cntBlocksInLongestChain = 0
+
+	currBlock = block
+	while(currBlock and currBlock.timestamp >= warmup):
+		# If block is not genesis block and coinbase txn is given to the node (the node has created/mined this block)
+		if not currBlock.isGenesis and currBlock.transactions[0].toNode == nodeID:
+			cntBlocksInLongestChain += 1
+
+		currBlock = currBlock.previousBlock
+
+	return cntBlocksInLongestChain
+
+# Blocks of a block tree created at or after warmup: (number of blocks, number of blocks mined by the node, length of the chain ending at leaf)
+def count_blocks_after_warmup(blockTree, nodeID, leaf, warmup):
+	blocks = [blockInfo["Block"] for blockInfo in blockTree.values() if blockInfo["Block"].timestamp >= warmup]
+	cntBlocksMined = sum(1 for block in blocks if not block.isGenesis and block.transactions[0].toNode == nodeID)
+
+	lengthOfChain = 0
+	currBlock = leaf
+	while(currBlock and currBlock.timestamp >= warmup):
+		lengthOfChain += 1
+		currBlock = currBlock.previousBlock
+
+	return len(blocks), cntBlocksMined, lengthOfChain
+
+# Metrics of an honest node (same as written in the Records files), ratios are None when undefined (0/0)
+# With a warmup (simulated milliseconds), blocks created before it are left out of the counts
+def get_node_record(node, warmup=0):
+	longestChainLeaf = get_longest_chain_leaf(node.blocksSeen)
+	cntBlocksInLongestChain = count_blocks_in_chain(longestChainLeaf, node.nodeID, warmup)
+
+	if warmup:
+		totalBlocks, cntBlocksMined, lengthOfLongestChain = count_blocks_after_warmup(node.blocksSeen, node.nodeID, longestChainLeaf, warmup)
+	else:
+		totalBlocks, cntBlocksMined, lengthOfLongestChain = len(node.blocksSeen), node.cntSuccessfulBlocks, longestChainLeaf.depth + 1
+
+	return {
+		"nodeID": node.nodeID,
+		"totalBlocks": totalBlocks,
+		"blocksMined": cntBlocksMined,
+		"blocksInLongestChain": cntBlocksInLongestChain,
+		"lengthOfLongestChain": lengthOfLongestChain,
+		"MPU_node_honest": cntBlocksInLongestChain / cntBlocksMined if cntBlocksMined else None,
+		"MPU_node_overall": lengthOfLongestChain / totalBlocks if totalBlocks else None,
+	}
+
+# Metrics of an attack node (same as written in the Records files), ratios are None when undefined (0/0)
+# With a warmup (simulated milliseconds), blocks created before it are left out of the counts (public blocks are then counted in the block tree)
+def get_attack_node_record(node, warmup=0):
+	longestChainLeaf = get_longest_chain_leaf(node.blocksTree)
+	cntBlocksInLongestChain = count_blocks_in_chain(longestChainLeaf, node.nodeID, warmup)
+	privateBlocks = sum(1 for privateBlock in node.privateChain if privateBlock[1].timestamp >= warmup)
+
+	if warmup:
+		totalBlocks, cntPublicBlocksMined, lengthOfLongestChain = count_blocks_after_warmup(node.blocksTree, node.nodeID, longestChainLeaf, warmup)
+		cntBlocksMined = cntPublicBlocksMined + privateBlocks
+	else:
+		totalBlocks, cntBlocksMined, lengthOfLongestChain = len(node.blocksTree), node.cntSuccessfulBlocks, longestChainLeaf.depth + 1
+		cntPublicBlocksMined = cntBlocksMined - privateBlocks
+
+	return {
+		"nodeID": node.nodeID,
+		"hashPower": node.hashPower,
+		"totalBlocks": totalBlocks,
+		"blocksMined": cntBlocksMined,
+		"privateBlocks": privateBlocks,
+		"blocksInLongestChain": cntBlocksInLongestChain,
+		"lengthOfLongestChain": lengthOfLongestChain,
+		"MPU_node_adv": cntBlocksInLongestChain / cntPublicBlocksMined if cntPublicBlocksMined else None,
+		"MPU_node_overall": lengthOfLongestChain / totalBlocks if totalBlocks else None,
+		"fractionInMainChain": cntBlocksInLongestChain / lengthOfLongestChain if lengthOfLongestChain else None,
+	}
+
+# Mean of the defined values, None if there are none
+def mean(values):
+	values = [value for value in values if value is not None]
+	return sum(values) / len(values) if values else None
+
+# Flat summary of a run: chain statistics seen by the honest nodes and metrics of both adversaries
+def summarize_run(nodeArray, warmup=0):
+	honestRecords = [get_node_record(node, warmup) for node in nodeArray[:-2]]
+
+	summary = {
+		"lengthOfLongestChain": max(record["lengthOfLongestChain"] for record in honestRecords),
+		"totalBlocks": max(record["totalBlocks"] for record in honestRecords),
+		"MPU_node_overall": mean(record["MPU_node_overall"] for record in honestRecords),
+		"MPU_node_honest": mean(record["MPU_node_honest"] for record in honestRecords),
+	}
+
+	for adversary, node in (("adv1", nodeArray[-2]), ("adv2", nodeArray[-1])):
+		record = get_attack_node_record(node, warmup)
+		for metric in ("hashPower", "blocksMined", "privateBlocks", "blocksInLongestChain", "MPU_node_adv", "MPU_node_overall", "fractionInMainChain"):
+			summary[adversary + "_" + metric] = record[metric]
+
+	return summary
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+from multiprocessing import Pool
+from statistics import NormalDist
+from sweep import simulate, run_config, set_warm_start
+from simulator import SimulationConfig, Simulator
+import dataclasses
+import contextlib
+import io
+import numpy as np
+import math
+import os
+import csv
+import sys
+
+'''
+Monte Carlo replications of one simulation, every replication is a run with its own seed (simulated in a worker process)
+
+Usage : python3 replicate.py nodes zeta_1 zeta_2 T_Tx I maxEventLoop [--name=value ...]
+	--seed: Seed of the first replication, replication i uses seed + i (random if not given)
+	--minReplications: Replications run before the stopping rule is checked (default 5)
+	--maxReplications: Replications run at most (default 100)
+	--targetWidth: Stop once the confidence intervals of all target metrics are narrower than this (half width, default 0.01)
+	--targetMetrics: Comma separated metrics of the stopping rule (default adv1_MPU_node_adv,adv2_MPU_node_adv)
+	--confidence: Confidence level of the intervals (default 0.95)
+	--workers: Number of replications run in parallel (default: number of CPUs)
+	--output: CSV file with one row per replication (not written if not given)
+	--warmStart: Simulate the first T milliseconds once (seed of the first replication) and continue every replication from there
+	  with its own seed (the replications share the topology and the warm-up chains)
+	--compare: Paired comparison with another configuration, comma separated changes of the arguments, e.g. --compare=zeta_1=0.25
+	  or --compare="zeta_1=0.25,--stopTime=500000". Every replication simulates both configurations with the same seed (common
+	  random numbers) and the stopping rule applies to the differences (compare - base) of the target metrics. With --warmStart
+	  only zeta_1, zeta_2 and the options of the run (e.g. --stopTime) can change, the network is the one of the snapshot
+	Other options (e.g. --warmup=T, --stopTime=T) are given to every main.py run
+
+Common random numbers: runs with the same seed share the topology, the link parameters and every random stream of the nodes
+(transaction workload, latencies, POW times scaled by the hash power, ...), all of them are derived from the seed and their
+names only (see rng.py). Two configurations run with the same seed only differ by the changed parameters, so the difference
+of their metrics is far less noisy than the one of independent runs and needs fewer replications for the same precision.
+'''
+
+replicateArguments = {
+	'seed'              : None,
+	'minReplications'   : '5',
+	'maxReplications'   : '100',
+	'targetWidth'       : '0.01',
+	'targetMetrics'     : 'adv1_MPU_node_adv,adv2_MPU_node_adv',
+	'confidence'        : '0.95',
+	'workers'           : None,
+	'output'            : None,
+	'warmStart'         : None,
+	'compare'           : None,
+}
+
+# Columns of the summary that are parameters of the run, not metrics
+runColumns = ("nodes", "zeta_1", "zeta_2", "T_Tx", "I", "maxEventLoop", "seed", "events", "simulatedTime", "wallTime", "stopReason", "warmup")
+
+# Parse the replication arguments, None if they are incorrect (unknown options are kept for main.py)
+def parse_replicate_arguments(argv):
+	positional = [argument for argument in argv[1:] if not argument.startswith("--")]
+	if len(positional) != 6:
+		print(__doc__)
+		return None
+
+	arguments = dict(replicateArguments)
+	arguments['run'] = dict(zip(("nodes", "zeta_1", "zeta_2", "T_Tx", "I", "maxEventLoop"), positional))
+	arguments['options'] = []
+
+	for argument in argv[1:]:
+		if not argument.startswith("--"):
+			continue
+		name, _, value = argument[2:].partition("=")
+		if name in replicateArguments:
+			arguments[name] = value
+		else:
+			arguments['options'].append(argument)
+
+	return arguments
+
+# Distribution function of the Student t distribution with 3 degrees of freedom (closed form)
+def t3_cdf(t):
+	x = t / math.sqrt(3)
+	return 0.5 + (x / (1 + x * x) + math.atan(x)) / math.pi
+
+# Quantile of the Student t distribution: exact up to 3 degrees of freedom (closed forms, bisection on t3_cdf), Cornish-Fisher
+# expansion around the normal quantile above (accurate to about 0.2% from 4 degrees of freedom, 11% low at 1 degree of freedom)
+def t_quantile(p, degreesOfFreedom):
+	v = degreesOfFreedom
+	if v == 1:
+		return math.tan(math.pi * (p - 0.5))
+	if v == 2:
+		return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+	if v == 3:
+		low, high = -1.0, 1.0
+		while t3_cdf(low) > p:
+			low *= 2
+		while t3_cdf(high) < p:
+			high *= 2
+		for _ in range(100):
+			middle = (low + high) / 2
+			if t3_cdf(middle) < p:
+				low = middle
+			else:
+				high = middle
+		return (low + high) / 2
+
+	z = NormalDist().inv_cdf(p)
+	return (z + (z**3 + z) / (4 * v)
+		+ (5 * z**5 + 16 * z**3 + 3 * z) / (96 * v**2)
+		+ (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * v**3)
+		+ (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / (92160 * v**4))
+
+# Mean and confidence interval half width of the defined values, (mean, halfWidth, count)
+def confidence_interval(values, confidence):
+	values = np.array([value for value in values if value is not None], dtype=float)
+	if len(values) == 0:
+		return float("nan"), float("nan"), 0
+	if len(values) == 1:
+		return values[0], float("inf"), 1
+
+	halfWidth = t_quantile(0.5 + confidence / 2, len(values) - 1) * values.std(ddof=1) / math.sqrt(len(values))
+	return values.mean(), halfWidth, len(values)
+
+# Boolean value stating whether the confidence intervals of all target metrics are narrow enough
+def precise_enough(summaries, targetMetrics, targetWidth, confidence):
+	for metric in targetMetrics:
+		_, halfWidth, count = confidence_interval([summary.get(metric) for summary in summaries], confidence)
+		# Metrics undefined in every replication (e.g. an adversary that never mined) do not hold the replications back
+		if count and not halfWidth <= targetWidth:
+			return False
+	return True
+
+# Run (main.py arguments) and options of the compared configuration: the base one with the changes of --compare
+def compared_configuration(arguments):
+	run = dict(arguments['run'])
+	options = list(arguments['options'])
+
+	for change in arguments['compare'].split(","):
+		change = change.strip().lstrip("-")
+		name, _, value = change.partition("=")
+		if name in run:
+			run[name] = value
+		else:
+			# Later options override the earlier ones
+			options.append("--" + change)
+
+	return run, options
+
+# Parameters of the network changed by --compare, a warm start continues the same snapshot in both configurations so only seed,
+# zeta_1, zeta_2 and the options of the run (stop conditions, outputs) can change (see Simulator.fork)
+def network_changes(arguments):
+	output = io.StringIO()
+	with contextlib.redirect_stdout(output):
+		base = run_config(dict(arguments['run'], seed="1"), arguments['options'])
+		run, options = compared_configuration(arguments)
+		compare = run_config(dict(run, seed="1"), options)
+
+	# Incorrect arguments are reported by the runs themselves
+	if base is None or compare is None:
+		return []
+	return [name for name in SimulationConfig.networkParameters
+		if getattr(base, name) != getattr(compare, name) and (name != "blockSize" or base.blockOnly)]
+
+# Paired differences (compare - base) of the metrics of the replications, None where a metric is undefined in one of the two runs
+def paired_differences(replications):
+	differences = []
+	for base, compare in replications:
+		metrics = [name for name in base if name not in runColumns and isinstance(base[name], (int, float, type(None)))]
+		differences.append({ metric: None if base[metric] is None or compare.get(metric) is None else compare[metric] - base[metric] for metric in metrics })
+	return differences
+
+# Simulate the warm-up (until simulated time warmStart) of the first replication and return its snapshot
+def warm_start(arguments, seed, warmStart):
+	output = io.StringIO()
+	try:
+		with contextlib.redirect_stdout(output):
+			config = run_config(dict(arguments['run'], seed=str(seed)), arguments['options'])
+			if config is None:
+				raise ValueError((output.getvalue().strip().splitlines() or ["incorrect arguments"])[-1])
+			simulator = Simulator(dataclasses.replace(config, stopTime=warmStart))
+			simulator.step(config.maxEventLoop)
+	except ValueError as error:
+		print("FAILED: warm start : " + str(error))
+		sys.exit()
+
+	print("Warm start: " + str(simulator.cnt) + " events, simulated time " + str(simulator.currTime) + " milliseconds")
+	return simulator.snapshot()
+
+# Run replications in parallel until the target precision or maxReplications is reached, returns the summaries of every replication,
+# Structure = [ [ base summary ], ... ], or [ [ base summary, compare summary ], ... ] with --compare
+# The stopping rule only looks at replications 0, 1, 2, ... in seed order, so that fast replications do not bias the estimate
+def run_replications(arguments):
+	baseSeed = int(arguments['seed']) if arguments['seed'] is not None else int(np.random.SeedSequence().entropy % (1 << 32))
+	minReplications = int(arguments['minReplications'])
+	maxReplications = int(arguments['maxReplications'])
+	targetWidth = float(arguments['targetWidth'])
+	targetMetrics = arguments['targetMetrics'].split(",")
+	confidence = float(arguments['confidence'])
+	workers = int(arguments['workers']) if arguments['workers'] else os.cpu_count()
+
+	if arguments['warmStart'] is not None and arguments['compare'] is not None:
+		changes = network_changes(arguments)
+		if changes:
+			print("FAILED: --compare cannot change " + ", ".join(changes) + " with --warmStart (only zeta_1, zeta_2 and the options of the run)")
+			sys.exit()
+
+	print("Base seed: " + str(baseSeed))
+
+	snapshot = None if arguments['warmStart'] is None else warm_start(arguments, baseSeed, int(arguments['warmStart']))
+
+	# Configurations simulated by every replication (with the seed of the replication)
+	configurations = [(arguments['run'], arguments['options'])]
+	if arguments['compare'] is not None:
+		configurations.append(compared_configuration(arguments))
+
+	def submit(pool, i):
+		return [pool.apply_async(simulate, ((dict(run, seed=str(baseSeed + i)), options),)) for run, options in configurations]
+
+	replications = []
+	with Pool(workers, initializer=set_warm_start, initargs=(snapshot,)) as pool:
+		# Keeping every worker busy with the next replications
+		submitted = [submit(pool, i) for i in range(min(maxReplications, max(1, workers // len(configurations))))]
+
+		while len(replications) < len(submitted):
+			summaries = []
+			for run, summary, error in (result.get() for result in submitted[len(replications)]):
+				if summary is None:
+					print("FAILED: seed=" + run['seed'] + " : " + error)
+					sys.exit()
+				summaries.append(summary)
+			replications.append(summaries)
+
+			# With --compare the precision is the one of the paired differences
+			stoppingSummaries = paired_differences(replications) if len(configurations) == 2 else [summaries[0] for summaries in replications]
+			if len(replications) >= minReplications and precise_enough(stoppingSummaries, targetMetrics, targetWidth, confidence):
+				print("Target precision reached after " + str(len(replications)) + " replications")
+				# Replications still running are not needed, but they are left to end: a worker terminated while it sends its
+				# result would keep the lock of the result queue and deadlock the pool
+				pool.close()
+				pool.join()
+				break
+
+			if len(submitted) < maxReplications:
+				submitted.append(submit(pool, len(submitted)))
+		else:
+			print("Target precision not reached after " + str(len(replications)) + " replications (maxReplications)")
+
+	return replications
+
+# Print the mean and confidence interval of every metric
+def report(summaries, confidence):
+	metrics = [name for name in summaries[0] if name not in runColumns and isinstance(summaries[0][name], (int, float, type(None)))]
+
+	print("\n{:<28} {:>12} {:>12} {:>27} {:>5}".format("Metric", "Mean", "Half width", "Confidence interval (" + "{:.0%}".format(confidence) + ")", "n"))
+	for metric in metrics:
+		mean, halfWidth, count = confidence_interval([summary.get(metric) for summary in summaries], confidence)
+		print("{:<28} {:>12.6g} {:>12.6g} {:>27} {:>5}".format(metric, mean, halfWidth, "[{:.6g}, {:.6g}]".format(mean - halfWidth, mean + halfWidth), count))
+
+# Write one row per run, with --compare the variant column tells the base and compared runs apart
+def write_replications(replications, output):
+	if len(replications[0]) == 1:
+		rows = [summaries[0] for summaries in replications]
+	else:
+		rows = [dict(summary, variant=variant) for summaries in replications for variant, summary in zip(("base", "compare"), summaries)]
+
+	with open(output, 'w', newline='') as f:
+		writer = csv.DictWriter(f, fieldnames=list(rows[0]), extrasaction='ignore')
+		writer.writeheader()
+		writer.writerows(rows)
+
+if __name__ == "__main__":
+	arguments = parse_replicate_arguments(sys.argv)
+
+	if arguments is None:
+		sys.exit()
+
+	replications = run_replications(arguments)
+	confidence = float(arguments['confidence'])
+
+	if arguments['compare'] is None:
+		report([summaries[0] for summaries in replications], confidence)
+	else:
+		print("\nBase configuration:")
+		report([summaries[0] for summaries in replications], confidence)
+		print("\nCompared configuration (" + arguments['compare'] + "):")
+		report([summaries[1] for summaries in replications], confidence)
+		print("\nPaired differences (compare - base), common random numbers:")
+		report(paired_differences(replications), confidence)
+
+	if arguments['output'] is not None:
+		write_replications(replications, arguments['output'])
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import zlib
+import numpy as np
+
+# Registry of independent random number streams derived from a single seed
+class RandomStreams:
+	'''
+	seed: Root seed of the simulation (random entropy if not given, printed so that the run can be reproduced)
+
+	Every stream is identified by a subsystem name and optional integer keys (e.g. a NodeID), and is seeded from
+	SeedSequence(seed, spawn_key=(crc32(name), keys...)). Streams do not depend on the order in which they are
+	created, so the same seed gives the same topology, link delays, workload, ... whatever else changes in the run.
+
+	'''
+	def __init__(self, seed=None):
+		self.seed = np.random.SeedSequence(seed).entropy
+
+	# Get the generator for a subsystem name and keys
+	def stream(self, name, *keys):
+		return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(zlib.crc32(name.encode()),) + keys))
+
+# Pool of exponential variates drawn from a generator in vectorized blocks and handed out one by one
+class VariatePool:
+	'''
+	rng: Random number generator the variates are drawn from (the pool is its only user)
+	variates: Pre-drawn standard exponential variates (Python floats)
+	position: Index of the next variate to hand out
+	blockSize: Number of variates drawn at the next refill, doubles at every refill up to maxBlockSize
+
+	A block of n standard exponentials is the same sequence as n single draws, so a pool gives the same values as calling
+	rng.exponential(scale) every time. Blocks start small so that the many rarely used pools of a large network stay small.
+
+	'''
+	def __init__(self, rng, blockSize=16, maxBlockSize=256):
+		self.rng = rng
+		self.variates = []
+		self.position = 0
+		self.blockSize = blockSize
+		self.maxBlockSize = maxBlockSize
+
+	# Exponential variate of mean scale
+	def exponential(self, scale):
+		if self.position == len(self.variates):
+			self.refill()
+
+		value = self.variates[self.position]
+		self.position += 1
+		return scale * value
+
+	# List of count standard exponential variates (mean 1), the same ones as count calls to exponential(1)
+	def standard(self, count):
+		values = self.variates[self.position:self.position + count]
+		self.position += len(values)
+
+		while len(values) < count:
+			self.refill()
+			missing = self.variates[:count - len(values)]
+			self.position = len(missing)
+			values.extend(missing)
+
+		return values
+
+	# Continue with another generator, the variates drawn from the previous one are dropped
+	def reseed(self, rng):
+		self.rng = rng
+		self.variates = []
+		self.position = 0
+
+	# Draw the next block of variates
+	def refill(self):
+		self.variates = self.rng.standard_exponential(self.blockSize).tolist()
+		self.position = 0
+		self.blockSize = min(2 * self.blockSize, self.maxBlockSize)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+from bisect import insort
+import heapq
+
+# First sequence number of the events created by no node (see EventQueue)
+unownedSequences = 1 << 62
+
+# Priority queue of future events (sorted by increasing order of timestamp) supporting O(1) cancellation
+class EventQueue:
+	'''
+	cntQueued: Number of entries stored in the queue (including tombstones)
+	cntScheduled: Number of events scheduled so far
+	cntCreated: Number of events created so far by each node, Structure = { NodeID (-1 for genesis) : count, ... }
+	cntCancelled: Number of tombstones currently present in the queue
+	cntSkipped: Number of tombstones dropped so far at the front of the queue (the others are removed by compactions)
+	compactionRatio: The queue is compacted (tombstones removed) when tombstones exceed this fraction of the queue
+	minCompactionSize: Queues smaller than this are never compacted (lazy skipping is cheaper)
+
+	Entries are (timestamp, sequence number, event) tuples, so comparisons never reach the Event objects.
+	The sequence number of an event is (count << 32) | (NodeID + 1), where count is the number of events created before it by
+	the same node (createdBy). Ties on timestamp are then broken the same way whatever the order in which the events of
+	different nodes are executed, which lets the parallel engine (parallel.py) reproduce the sequential one. Events created by
+	no node (the genesis event, the events it creates and the ("mining", "race") events) are numbered from unownedSequences,
+	so they come after the events of the nodes at the same timestamp.
+	The ("mining", "race") events of the global mining engine are the only events creating an event for a node at the same
+	timestamp (the winner's POW completion). Coming after the events of the nodes, their completion is executed after every
+	event of the winner already at that timestamp.
+	The Event object returned by schedule() is its own cancellation handle, so nodes can keep a reference to the
+	event they may need to cancel later (e.g. a pending broadcast of a block that is no longer on the longest chain).
+	Storage of the entries is left to the subclasses (push_entry, peek_entry, pop_entry, entries, rebuild).
+
+	'''
+	def __init__(self, compactionRatio=0.5, minCompactionSize=1024):
+		self.cntQueued = 0
+		self.cntScheduled = 0
+		self.cntCreated = dict()
+		self.cntCancelled = 0
+		self.cntSkipped = 0
+		self.compactionRatio = compactionRatio
+		self.minCompactionSize = minCompactionSize
+
+	# Number of live (not cancelled) events in the queue
+	def __len__(self):
+		return self.cntQueued - self.cntCancelled
+
+	# Add an event to the queue and return its handle
+	def schedule(self, event):
+		return self.insert(event, self.next_sequence(event.createdBy))
+
+	# Add the events created by an event (in creation order)
+	def schedule_all(self, events):
+		cntCreated = self.cntCreated
+		for event in events:
+			origin = event.createdBy
+			if origin is None:
+				sequence = self.next_sequence(None)
+			else:
+				count = cntCreated.get(origin, 0)
+				cntCreated[origin] = count + 1
+				sequence = (count << 32) | (origin + 1)
+			event.pending = True
+			self.push_entry((event.timestamp, sequence, event))
+			self.cntScheduled += 1
+			self.cntQueued += 1
+
+	# Sequence number of the next event created by a node (None for the genesis event and the events it creates)
+	def next_sequence(self, createdBy):
+		origin = -1 if createdBy is None else createdBy
+		count = self.cntCreated.get(origin, 0)
+		self.cntCreated[origin] = count + 1
+		if createdBy is None:
+			return unownedSequences + count
+		return (count << 32) | (origin + 1)
+
+	# Add an event with a given sequence number to the queue and return its handle
+	def insert(self, event, sequence):
+		event.pending = True
+		self.push_entry((event.timestamp, sequence, event))
+		self.cntScheduled += 1
+		self.cntQueued += 1
+		return event
+
+	# Cancel a scheduled event using its handle, cancelling an executed (or already cancelled) event does nothing
+	def cancel(self, handle):
+		if handle is None or not handle.pending or handle.cancelled:
+			return
+
+		handle.cancelled = True
+		self.cntCancelled += 1
+
+		# Too many tombstones, removing them from the queue
+		if self.cntCancelled > self.compactionRatio * self.cntQueued and self.cntQueued >= self.minCompactionSize:
+			self.compact()
+
+	# Removing all the tombstones from the queue
+	def compact(self):
+		liveEntries = [entry for entry in self.entries() if not entry[2].cancelled]
+		self.rebuild(liveEntries)
+		self.cntQueued = len(liveEntries)
+		self.cntCancelled = 0
+
+	# Get nearest live event without removing it from the queue, None if the queue is empty
+	def peek(self):
+		while self.cntQueued:
+			event = self.peek_entry()[2]
+			if not event.cancelled:
+				return event
+
+			# Dropping the tombstone at the front of the queue
+			self.pop_entry()
+			self.cntQueued -= 1
+			self.cntCancelled -= 1
+			self.cntSkipped += 1
+			event.pending = False
+
+		return None
+
+	# Get nearest live event (lowest timestamp), None if the queue is empty
+	def pop(self):
+		while self.cntQueued:
+			event = self.pop_entry()[2]
+			self.cntQueued -= 1
+			event.pending = False
+
+			# Skipping tombstones
+			if event.cancelled:
+				self.cntCancelled -= 1
+				self.cntSkipped += 1
+				continue
+
+			return event
+
+		return None
+
+# Binary heap backend (O(log n) enqueue and dequeue)
+class HeapEventQueue(EventQueue):
+	'''
+	queue: Min heap of (timestamp, sequence number, event) entries
+
+	'''
+	def __init__(self, compactionRatio=0.5, minCompactionSize=1024):
+		super().__init__(compactionRatio, minCompactionSize)
+		self.queue = []
+
+	def push_entry(self, entry):
+		heapq.heappush(self.queue, entry)
+
+	def peek_entry(self):
+		return self.queue[0]
+
+	def pop_entry(self):
+		return heapq.heappop(self.queue)
+
+	def entries(self):
+		return self.queue
+
+	def rebuild(self, entries):
+		self.queue = list(entries)
+		heapq.heapify(self.queue)
+
+# Calendar queue backend with one day per millisecond (timestamps are integer milliseconds), O(1) enqueue and dequeue of the
+# events of a day, O(log d) to move to the next day where d is the number of days holding events
+class CalendarEventQueue(EventQueue):
+	'''
+	days: Entries of each day in scheduling order (sorted when the day comes), Structure = { timestamp : [ entries ] }
+	dayHeap: Min heap of the timestamps of days
+	today: Timestamp of the day being dequeued, None before the first dequeue
+	todayEntries: Entries of today sorted by sequence number, the ones before position are already dequeued
+	position: Index of the next entry of todayEntries
+
+	A calendar queue (R. Brown, 1988) spreads the entries over buckets ("days") of a fixed width, so that enqueueing is a
+	bucket append and dequeueing reads the current bucket. Timestamps are integer milliseconds and the networks create many
+	events at every millisecond (hundreds of receive events with a few hundred nodes), so days are exactly one millisecond
+	wide: every entry of a day has the same timestamp, no day width has to be estimated and no bucket ever needs a resize.
+	The next day holding entries is taken from a heap of plain integers, one per day instead of one per entry, and the
+	entries of a day are sorted by sequence number once, when the day comes.
+	Entries are only added before today by the parallel engine (after a peek), today's remaining entries then go back to
+	their day.
+
+	'''
+	def __init__(self, compactionRatio=0.5, minCompactionSize=1024):
+		super().__init__(compactionRatio, minCompactionSize)
+		self.days = dict()
+		self.dayHeap = []
+		self.today = None
+		self.todayEntries = []
+		self.position = 0
+
+	def push_entry(self, entry):
+		timestamp = entry[0]
+		if timestamp == self.today:
+			insort(self.todayEntries, entry, self.position)
+			return
+		if self.today is not None and timestamp < self.today:
+			self.postpone_today()
+
+		day = self.days.get(timestamp)
+		if day is None:
+			self.days[timestamp] = [entry]
+			heapq.heappush(self.dayHeap, timestamp)
+		else:
+			day.append(entry)
+
+	def peek_entry(self):
+		if self.position == len(self.todayEntries):
+			self.next_day()
+		return self.todayEntries[self.position]
+
+	def pop_entry(self):
+		if self.position == len(self.todayEntries):
+			self.next_day()
+		entry = self.todayEntries[self.position]
+		self.position += 1
+		return entry
+
+	# Move to the next day holding entries (only called on a non empty queue)
+	def next_day(self):
+		self.today = heapq.heappop(self.dayHeap)
+		self.todayEntries = self.days.pop(self.today)
+		self.todayEntries.sort()
+		self.position = 0
+
+	# Put the remaining entries of today back to their day (an entry is added before today)
+	def postpone_today(self):
+		remaining = self.todayEntries[self.position:]
+		if remaining:
+			self.days[self.today] = remaining
+			heapq.heappush(self.dayHeap, self.today)
+		self.today = None
+		self.todayEntries = []
+		self.position = 0
+
+	def entries(self):
+		yield from self.todayEntries[self.position:]
+		for day in self.days.values():
+			yield from day
+
+	def rebuild(self, entries):
+		self.days = dict()
+		self.dayHeap = []
+		self.todayEntries = []
+		self.position = 0
+		for entry in entries:
+			self.push_entry(entry)
+
+# Available event queue backends, selected from the command line
+schedulers = {
+	"heap"     : HeapEventQueue,
+	"calendar" : CalendarEventQueue,
+}
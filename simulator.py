@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+from dataclasses import dataclass, fields
+from initialize import init_nodes, init_block_only, init_transaction_batches, init_first_passage, reseed_nodes, set_hash_powers
+from event import Event
+from scheduler import schedulers
+from stopping import StopConditions
+from tracing import Tracer
+from checkpoint import Checkpointer, load_checkpoint, dump_simulation, load_simulation
+from rng import RandomStreams
+from records import summarize_run
+from parallel import run_parallel
+from mining import MiningRace
+from block import BlockSizes
+from observers import Observers
+from metrics import MetricsCollector
+from profiling import EventStats, Profiler, parse_window
+from contextlib import nullcontext
+from generateNodesGraph import generate_blockchain_graph_visualization, generate_records_of_all_nodes
+import os
+import time
+import json
+
+'''
+Embeddable simulator
+
+A Simulator is built from a SimulationConfig, run (or stepped a few events at a time) and gives a SimulationResult. Simulations
+share no state, their randomness comes from their own streams and their files go to their own results directory, so many of
+them can be run one after the other in the same process. main.py is the command line front end.
+
+Warm-start forking: snapshot() keeps the state of a simulation in memory (e.g. at the end of a warm-up) and every
+Simulator(config, snapshot) continues it independently. A config seed different from the snapshot's reseeds all the random
+streams and zeta_1 / zeta_2 different from the snapshot's change the hash powers of the adversaries (topology, chains and
+messages in flight are kept). These are the only parameters of the network a fork can change, the nodes, the topology and the
+events in flight depend on the other ones (SimulationConfig.networkParameters): the config must give the snapshot's values
+(ValueError otherwise), stop conditions and outputs are free. Resuming from a checkpoint file (--resume) forks the same way.
+
+	config = SimulationConfig(nodes=20, zeta_1=0.3, zeta_2=0.2, T_Tx=1000, I=600, maxEventLoop=10**6, stopTime=100000, seed=1, trace="off", noReport=True)
+	result = Simulator(config).run()
+	print(result.summary()['MPU_node_overall'])
+
+	warm = Simulator(dataclasses.replace(config, stopTime=50000))
+	warm.step(config.maxEventLoop)
+	snapshot = warm.snapshot()
+	results = [Simulator(dataclasses.replace(config, seed=seed, zeta_1=0.25), snapshot).run() for seed in range(2, 10)]
+'''
+
+# Sub directories of the results directory
+resultsSubdirectories = ("GraphOfNodes", "BlockChains/PDF", "BlockChains/PNG", "Records/HTML", "Records/txt")
+
+# Value of an on/off option, given alone (--blockOnly) or as --blockOnly=True/1/true or --blockOnly=False/0/false
+def parse_flag(value):
+	if value is True or value in ("True", "1", "true"):
+		return True
+	if value is False or value in ("False", "0", "false"):
+		return False
+	raise ValueError("Incorrect value " + str(value) + " of an on/off option, use True/1/true or False/0/false!!!!")
+
+# Parameters of a simulation, the names and meanings are the ones of the main.py arguments and options
+@dataclass
+class SimulationConfig:
+	nodes: int
+	zeta_1: float
+	zeta_2: float
+	T_Tx: int
+	I: int
+	maxEventLoop: int
+	scheduler: str = "heap"
+	stopTime: int | None = None
+	stopHeight: int | None = None
+	stopBlocks: int | None = None
+	wallTime: float | None = None
+	trace: str = "event"
+	traceSample: int = 1
+	progressInterval: float = 10
+	traceFile: str | None = None
+	checkpointFile: str | None = None
+	checkpointEvery: int | None = None
+	checkpointInterval: float | None = None
+	resume: str | None = None
+	seed: int | None = None
+	noReport: bool = False
+	warmup: int = 0
+	parallel: int | None = None
+	mining: str = "node"
+	blockOnly: bool = False
+	blockSize: str = "uniform:1:1000"
+	txnBatch: int | None = None
+	txnPropagation: str = "flood"
+	resultsDirectory: str = "./Results"
+	metricsFile: str | None = None
+	metricsInterval: int = 10000
+	eventStats: bool = False
+	eventStatsFile: str | None = None
+	profile: str | None = None
+	profileEvents: str | None = None
+
+	# Conversion of the command line values (strings) of the parameters
+	argumentTypes = { 'nodes': int, 'zeta_1': float, 'zeta_2': float, 'T_Tx': int, 'I': int, 'maxEventLoop': int, 'stopTime': int, 'stopHeight': int,
+		'stopBlocks': int, 'wallTime': float, 'traceSample': int, 'progressInterval': float, 'checkpointEvery': int, 'checkpointInterval': float,
+		'seed': int, 'noReport': parse_flag, 'warmup': int, 'parallel': int, 'blockOnly': parse_flag, 'txnBatch': int, 'metricsInterval': int, 'eventStats': parse_flag }
+
+	# Parameters of the network a fork cannot change (see Simulator.fork), blockSize only matters in block only mode
+	networkParameters = ("nodes", "T_Tx", "I", "scheduler", "mining", "blockOnly", "blockSize", "txnBatch", "txnPropagation")
+
+	# Configuration from the arguments given by parseArguments (in utils.py), options not given keep their default values
+	@classmethod
+	def from_arguments(cls, inputs):
+		values = dict()
+		for field in fields(cls):
+			if inputs.get(field.name) is not None:
+				value = inputs[field.name]
+				values[field.name] = cls.argumentTypes[field.name](value) if field.name in cls.argumentTypes else value
+		return cls(**values)
+
+	# Check the parameters, raises ValueError explaining the first incorrect one
+	def validate(self):
+		if self.nodes <= 1:
+			raise ValueError("Node graph cannot be form using the given conditions (6 >= noOfPeers >= 3)!!!!")
+
+		if (self.zeta_1 + self.zeta_2) >= 1:
+			raise ValueError("Sum of hash powers of Adversaries is greater than equal to 1 (Not possible)!!!!")
+
+		if self.scheduler not in schedulers:
+			raise ValueError("Unknown scheduler " + str(self.scheduler) + ", available schedulers: " + ", ".join(schedulers))
+
+		if self.trace not in Tracer.levels:
+			raise ValueError("Unknown trace level " + str(self.trace) + ", available levels: " + ", ".join(Tracer.levels))
+
+		# Mining engine: every miner draws its own POW times ("node") or one race draws the next block of the network ("global")
+		if self.mining not in ("node", "global"):
+			raise ValueError("Unknown mining engine " + str(self.mining) + ", available engines: node, global")
+
+		# Block only mode: transactions are not simulated, blocks get synthetic sizes drawn from the blockSize distribution
+		if self.blockOnly:
+			try:
+				BlockSizes(self.blockSize, None)
+			except ValueError as error:
+				raise ValueError(str(error) + "!!!!")
+
+		# Batched transaction generation: every node creates a batch of transactions every txnBatch milliseconds
+		if self.txnBatch is not None and self.txnBatch < 1:
+			raise ValueError("Interval between two batches of transactions must be at least 1 millisecond!!!!")
+
+		# Transaction propagation: flooding with receive events ("flood") or first arrival times of every node ("firstPassage")
+		if self.txnPropagation not in ("flood", "firstPassage"):
+			raise ValueError("Unknown transaction propagation " + str(self.txnPropagation) + ", available propagations: flood, firstPassage")
+
+		# Time series of the chain metrics: one sample every metricsInterval simulated milliseconds
+		if self.metricsInterval < 1:
+			raise ValueError("Interval between two samples of metrics must be at least 1 millisecond!!!!")
+
+		# Profiles of the event loop (or of a window of its events) and of the report, written to the profile directory
+		if self.profileEvents is not None:
+			if self.profile is None:
+				raise ValueError("A window of profiled events needs a profile directory (--profile)!!!!")
+			parse_window(self.profileEvents)
+
+		# Parallel engine (number of worker processes), only simulated time and wall clock stop conditions are supported
+		if self.parallel is not None:
+			unsupported = [name for name in ('stopHeight', 'stopBlocks', 'traceFile', 'checkpointFile', 'resume', 'metricsFile', 'eventStatsFile', 'profile') if getattr(self, name) is not None]
+			if self.parallel < 1 or self.stopTime is None or unsupported or self.eventStats or self.mining != "node" or self.txnPropagation != "flood":
+				raise ValueError("The parallel engine needs at least 1 worker and --stopTime, and does not support: --" + ", --".join(('stopHeight', 'stopBlocks', 'traceFile', 'checkpointFile', 'resume', 'metricsFile', 'eventStats', 'eventStatsFile', 'profile', 'mining=global', 'txnPropagation=firstPassage')))
+
+# Outcome of a simulation
+@dataclass
+class SimulationResult:
+	config: SimulationConfig
+	nodeArray: list
+	seed: int
+	events: int
+	simulatedTime: int
+	wallTime: float
+	stopReason: str
+	eventStats: dict | None = None
+
+	# Summary of the run (parameters, run statistics and the statistics of records.py, blocks mined before the warm-up are left out)
+	def summary(self):
+		summary = { 'nodes': len(self.nodeArray) - 2, 'zeta_1': self.nodeArray[-2].hashPower, 'zeta_2': self.nodeArray[-1].hashPower, 'T_Tx': self.nodeArray[0].T_Tx, 'I': self.nodeArray[0].PoWI, 'seed': self.seed, 'events': self.events, 'simulatedTime': self.simulatedTime, 'wallTime': self.wallTime, 'stopReason': self.stopReason, 'warmup': self.config.warmup }
+		summary.update(summarize_run(self.nodeArray, self.config.warmup))
+		return summary
+
+# Remove the files of the previous report from the results directory
+def cleanup(directory):
+	for subdirectory in resultsSubdirectories[1:]:
+		path = os.path.join(directory, subdirectory)
+		os.makedirs(path, exist_ok=True)
+		for file in os.listdir(path):
+			os.remove(os.path.join(path, file))
+
+# Simulation of a P2P network with two selfish mining adversaries
+class Simulator:
+	'''
+	config: SimulationConfig of the simulation
+	colors: Colors to represent the adversary nodes
+	stopConditions: Stop conditions of the event loop
+	tracer: Tracing of the event loop (terminal output and trace file)
+	checkpointer: Periodic checkpoints of the simulation
+	streams: Random number streams of the simulation (all the randomness comes from them)
+	nodeArray: All the nodes, honest nodes first and the two attack nodes last
+	eventQueue: Queue of the future events
+	cnt: Number of events executed so far
+	currTime: Timestamp of the last executed event (milliseconds)
+	wallTime: Wall clock time spent in the event loop (seconds, including the runs before a resume)
+	started: Boolean value stating if the event loop started
+	finished: Boolean value stating if a stop condition is reached
+	result: SimulationResult, once the simulation is finished
+	observers: Observer hooks of the simulation (see observers.py), None until an observer is registered
+	metrics: Collector of the time series of the chain metrics (see metrics.py), None without a metrics file
+	eventStats: Counts and wall time of the event types, node methods and event queue operations (see profiling.py), None when not asked
+	dispatch: Handler of each event, the timed copy of the dispatch table of eventStats, None for the plain one (see event.py)
+	profiler: cProfile profiles of the event loop and of the report (see profiling.py), None without a profile directory
+
+	'''
+	def __init__(self, config, snapshot=None):
+		config.validate()
+		if snapshot is not None and config.parallel is not None:
+			raise ValueError("The parallel engine cannot continue a snapshot")
+
+		self.config = config
+		self.colors = { 0 : "red", 1 : "orange" }
+		self.stopConditions = StopConditions(config.maxEventLoop, config.stopTime, config.stopHeight, config.stopBlocks, config.wallTime)
+		self.tracer = Tracer(config.trace, config.traceSample, config.progressInterval, config.traceFile)
+		self.checkpointer = Checkpointer(config.checkpointFile, everyEvents=config.checkpointEvery, interval=config.checkpointInterval)
+		self.started = False
+		self.finished = False
+		self.result = None
+		self.observers = None
+		self.eventStats = EventStats() if config.eventStats or config.eventStatsFile is not None else None
+		self.profiler = Profiler(config.profile, config.profileEvents) if config.profile is not None else None
+
+		if snapshot is not None:
+			self.restore(load_simulation(snapshot), "snapshot")
+		elif config.resume is not None:
+			self.restore(load_checkpoint(config.resume), config.resume)
+		else:
+			self.initialize()
+
+		self.metrics = MetricsCollector(self, config.metricsInterval) if config.metricsFile is not None else None
+		self.dispatch = self.eventStats.dispatch_table(self.eventQueue) if self.eventStats is not None else None
+
+	# Distribution of the synthetic block sizes in block only mode, None when transactions are simulated
+	@property
+	def blockSize(self):
+		return self.config.blockSize if self.config.blockOnly else None
+
+	# Initialize the nodes, the P2P network and the event queue (with the genesis event)
+	def initialize(self):
+		config = self.config
+
+		# All the randomness of the simulation comes from streams derived from this seed
+		self.streams = RandomStreams(config.seed)
+		print("Seed: " + str(self.streams.seed))
+
+		# Initializing nodes and creating a P2P network
+		if not config.noReport:
+			os.makedirs(os.path.join(config.resultsDirectory, resultsSubdirectories[0]), exist_ok=True)
+		self.nodeArray = init_nodes(config.nodes, config.zeta_1, config.zeta_2, config.I, config.T_Tx, self.colors, self.streams, self.tracer.printsEvents, not config.noReport, config.resultsDirectory)
+		if self.blockSize is not None:
+			init_block_only(self.nodeArray, self.blockSize, self.streams)
+		if config.txnBatch is not None:
+			init_transaction_batches(self.nodeArray, config.txnBatch)
+		if config.txnPropagation == "firstPassage":
+			init_first_passage(self.nodeArray, self.streams)
+
+		print("============= Starting Simulation =============")
+
+		# Initializing the event queue with genesis block creation event
+		self.eventQueue = schedulers[config.scheduler]()
+		self.eventQueue.schedule(Event(0, None, None, self.streams.stream("genesis"), ("genesis",)))
+
+		# Global mining engine: the nodes hold their pending blocks and the first race follows the start of mining (timestamp 1)
+		if config.mining == "global":
+			for node in self.nodeArray:
+				node.miningEngine = "global"
+			race = MiningRace(self.nodeArray, config.I, self.streams.stream("race"))
+			self.eventQueue.schedule(Event(1 + round(race.next_block_time()), None, None, race, ("mining", "race")))
+
+		self.cnt = 0
+		self.currTime = 0
+		self.wallTime = 0.0
+
+	# Restore nodes (with their random number generators) and event queue from the state of a checkpoint or snapshot (network
+	# parameters come from the state), then fork it if the config asks for another seed or other adversaries
+	def restore(self, state, source):
+		self.nodeArray = state['nodeArray']
+		self.eventQueue = state['eventQueue']
+		self.cnt = state['cnt']
+		self.currTime = state['currTime']
+		self.wallTime = state['wallTime']
+		self.stopConditions.restore(state['chainStatistics'])
+		self.streams = state['streams']
+
+		print("============= Resuming Simulation from " + source + " (" + str(self.cnt) + " events, simulated time " + str(self.currTime) + " milliseconds) =============")
+
+		self.fork()
+
+	# Warm-start forking of a restored simulation with the seed and the adversary hash powers of the config, the other parameters
+	# of the network (networkParameters of SimulationConfig) must be the restored ones
+	def fork(self):
+		config = self.config
+		node = self.nodeArray[0]
+		configSizes = BlockSizes(config.blockSize, None) if config.blockOnly else None
+		fixed = {
+			"nodes": (config.nodes, len(self.nodeArray) - 2),
+			"T_Tx": (config.T_Tx, node.T_Tx),
+			"I": (config.I, node.PoWI),
+			"scheduler": (schedulers[config.scheduler], type(self.eventQueue)),
+			"mining": (config.mining, node.miningEngine),
+			"blockOnly": (config.blockOnly, node.blockSizes is not None),
+			"txnBatch": (config.txnBatch, node.txnBatchInterval),
+			"txnPropagation": (config.txnPropagation, "flood" if node.txnPropagation is None else "firstPassage"),
+		}
+		if configSizes is not None and node.blockSizes is not None:
+			fixed["blockSize"] = ((configSizes.kind, configSizes.parameters), (node.blockSizes.kind, node.blockSizes.parameters))
+		changed = [name for name, (value, restored) in fixed.items() if value != restored]
+		if changed:
+			raise ValueError("Only seed, zeta_1 and zeta_2 can differ from the restored simulation, not " + ", ".join(changed) + "!!!!")
+
+		reseed = config.seed is not None and config.seed != self.streams.seed
+		rehash = (config.zeta_1, config.zeta_2) != (self.nodeArray[-2].hashPower, self.nodeArray[-1].hashPower)
+		if not reseed and not rehash:
+			return
+
+		if reseed:
+			self.streams = RandomStreams(config.seed)
+			reseed_nodes(self.nodeArray, self.streams)
+			print("Seed: " + str(self.streams.seed) + " (forked)")
+		if rehash:
+			set_hash_powers(self.nodeArray, config.zeta_1, config.zeta_2)
+
+		self.redraw_mining(reseed)
+
+	# Draw again the pending POW completions (with the new hash powers and streams), the POW times being exponential (memoryless)
+	# this is the same as keeping them, except that forks do not share their next blocks
+	# With the global mining engine only the race is drawn again, a scheduled completion is a block already won by the race
+	def redraw_mining(self, reseed):
+		eventQueue = self.eventQueue
+
+		for node in self.nodeArray:
+			completion = node.futureBroadCastEvent if node.role == "honest" else (node.futureEvents[0] if node.futureEvents else None)
+			if node.miningEngine == "global" or completion is None or not completion.pending or completion.cancelled:
+				continue
+
+			redrawn = Event(self.currTime + round(node.calculate_POW_time()), completion.createdBy, completion.executedBy, completion.eventObject, completion.eventType)
+			eventQueue.cancel(completion)
+			eventQueue.schedule(redrawn)
+			if node.role == "honest":
+				node.futureBroadCastEvent = redrawn
+			else:
+				node.futureEvents[0] = redrawn
+
+		# Global mining engine: the next race is drawn again from the new hash powers
+		for entry in list(eventQueue.entries()):
+			raceEvent = entry[2]
+			if raceEvent.eventType != ("mining", "race") or raceEvent.cancelled:
+				continue
+			race = MiningRace(self.nodeArray, self.nodeArray[0].PoWI, self.streams.stream("race") if reseed else raceEvent.eventObject.rng)
+			eventQueue.cancel(raceEvent)
+			eventQueue.schedule(Event(self.currTime + round(race.next_block_time()), None, None, race, ("mining", "race")))
+
+	# Register a callback for an observer hook (see observers.py for the hooks and their payloads), observers are not kept by
+	# snapshots and checkpoints
+	def observe(self, hook, callback):
+		if self.config.parallel is not None:
+			raise ValueError("Observers are not supported by the parallel engine")
+		if self.observers is None:
+			self.observers = Observers()
+			for node in self.nodeArray:
+				node.observers = self.observers
+		self.observers.register(hook, callback)
+
+	# In-memory copy of the whole state of the simulation, continued by Simulator(config, snapshot) (see warm-start forking above)
+	def snapshot(self):
+		return dump_simulation(self.nodeArray, self.eventQueue, self.checkpoint_state(self.wallTime))
+
+	# State of the simulation stored in the checkpoints (with the nodes and the event queue)
+	def checkpoint_state(self, wallTime):
+		return { 'cnt': self.cnt, 'currTime': self.currTime, 'wallTime': wallTime, 'chainStatistics': self.stopConditions.statistics(), 'streams': self.streams }
+
+	# Start the clocks of the stop conditions and the tracer (once, before the first event)
+	def start(self):
+		if self.started:
+			return
+		self.started = True
+		self.stopConditions.start()
+		self.tracer.start(append = self.config.resume is not None, startCnt = self.cnt)
+
+	# Execute at most count events (fewer if a stop condition is reached), returns the number of executed events
+	def step(self, count=1):
+		if self.config.parallel is not None:
+			raise ValueError("The parallel engine simulates whole runs, use run()")
+		if self.finished:
+			return 0
+		self.start()
+
+		if self.profiler is None:
+			return self.run_events(count)
+
+		# Only the events of the window are profiled
+		executed = 0
+		for first, last, profiled in self.profiler.segments(self.cnt, self.cnt + count):
+			with self.profiler.profiling("eventLoop") if profiled else nullcontext():
+				executed += self.run_events(last - first)
+			if self.finished:
+				break
+		return executed
+
+	# Execute at most count events, with the wall time accounting if asked
+	def run_events(self, count):
+		if self.eventStats is None:
+			return self.execute_events(count)
+		with self.eventStats.timing(self.eventQueue):
+			return self.execute_events(count)
+
+	# Event loop of step()
+	def execute_events(self, count):
+		eventQueue = self.eventQueue
+		nodeArray = self.nodeArray
+		dispatch = self.dispatch
+		stopConditions = self.stopConditions
+		tracer = self.tracer
+		checkpointer = self.checkpointer
+		tracesEvents = tracer.tracesEvents
+		checkpointing = checkpointer.enabled
+		progressMask = Tracer.progressCheckInterval - 1
+		startWallTime = time.time() - self.wallTime
+		cnt = startCnt = self.cnt
+		currTime = self.currTime
+		lastCnt = cnt + count
+
+		# Loop until a stop condition is reached (at most maxEventLoop times)
+		while cnt < lastCnt:
+			if stopConditions.reached(cnt, eventQueue):
+				self.finished = True
+				break
+
+			# Getting nearest event (lowest timestamp), cancelled events are skipped by the queue
+			currEvent = eventQueue.pop()
+			currTime = currEvent.timestamp
+
+			# Executing the event and getting future events to be added
+			futureEvents, cancelledEvents, outcome = currEvent.execute(nodeArray, dispatch)
+
+			# Adding future events to the Event Queue
+			eventQueue.schedule_all(futureEvents)
+
+			# Cancelling events using their handles
+			for event in cancelledEvents:
+				eventQueue.cancel(event)
+
+			# Updating chain statistics used by the stop conditions
+			stopConditions.update(currEvent, nodeArray)
+
+			if tracesEvents:
+				tracer.record(cnt, currEvent, outcome, nodeArray)
+
+			# Incrementing count
+			cnt = cnt + 1
+
+			# Periodic progress line
+			if not cnt & progressMask:
+				tracer.progress(cnt, currTime, stopConditions)
+
+			# Periodic checkpoint
+			if checkpointing and checkpointer.due(cnt):
+				self.cnt, self.currTime = cnt, currTime
+				checkpointer.save(nodeArray, eventQueue, self.checkpoint_state(time.time() - startWallTime))
+
+		self.cnt = cnt
+		self.currTime = currTime
+		self.wallTime = time.time() - startWallTime
+		return cnt - startCnt
+
+	# Simulate until a stop condition is reached, returns the SimulationResult
+	def run(self):
+		config = self.config
+
+		if config.parallel is not None and not self.finished:
+			# Conservative parallel engine, the partitions are simulated by worker processes
+			self.start()
+			startWallTime = time.time() - self.wallTime
+			parameters = (config.nodes, config.zeta_1, config.zeta_2, config.I, config.T_Tx, self.streams.seed, self.blockSize, config.txnBatch)
+			self.nodeArray, self.cnt, self.currTime, self.stopConditions.reason = run_parallel(self.nodeArray, config.parallel, parameters, config.scheduler, self.stopConditions, self.tracer)
+			self.wallTime = time.time() - startWallTime
+			self.finished = True
+
+		while not self.finished:
+			self.step(self.stopConditions.maxEventLoop)
+
+		return self.finish()
+
+	# End the simulation: final checkpoint and report files, returns the SimulationResult
+	# It can also end a simulation stepped by the caller before any stop condition is reached
+	def finish(self):
+		if self.result is not None:
+			return self.result
+
+		if self.stopConditions.reason is None:
+			self.stopConditions.reason = "finished by the caller after " + str(self.cnt) + " events"
+		self.finished = True
+
+		self.tracer.finish(self.cnt, self.currTime, self.stopConditions.reason)
+
+		# Transactions arrived by the end of the run with first passage propagation
+		for node in self.nodeArray:
+			node.deliver_transactions(self.currTime)
+
+		# Last samples of the chain metrics
+		if self.metrics is not None:
+			self.metrics.close(self.currTime)
+			self.metrics.write(self.config.metricsFile)
+
+		# Final checkpoint, allows to extend the run later
+		if self.checkpointer.enabled:
+			self.checkpointer.save(self.nodeArray, self.eventQueue, self.checkpoint_state(self.wallTime))
+
+		print("============= Ending Simulation =============\n\n")
+
+		# Summary table of the wall time accounting
+		eventStats = None
+		if self.eventStats is not None:
+			eventStats = self.eventStats.to_dict()
+			print(self.eventStats.table(self.wallTime) + "\n")
+			if self.config.eventStatsFile is not None:
+				with open(self.config.eventStatsFile, 'w') as f:
+					json.dump(eventStats, f)
+
+		self.result = SimulationResult(self.config, self.nodeArray, self.streams.seed, self.cnt, self.currTime, self.wallTime, self.stopConditions.reason, eventStats)
+
+		if not self.config.noReport:
+			with self.profiler.profiling("report") if self.profiler is not None else nullcontext():
+				self.report()
+
+		if self.profiler is not None:
+			print("Profiles written to: " + ", ".join(self.profiler.write()))
+
+		return self.result
+
+	# Write the blockchain graphs and the records of all the nodes (HTML, PDF, TXT, PNG) to the results directory
+	def report(self):
+		cleanup(self.config.resultsDirectory)
+		print("Storing the information in multiple files (HTML, PDF, TXT, PNG)......")
+
+		generate_blockchain_graph_visualization(self.nodeArray, self.colors, self.config.resultsDirectory)
+		generate_records_of_all_nodes(self.nodeArray, self.config.resultsDirectory)
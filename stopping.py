@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import time
+
+# Stop conditions of the simulation, any reached condition ends the event loop
+class StopConditions:
+	'''
+	maxEventLoop: Maximum number of events to be executed
+	stopTime: Simulated time (milliseconds) after which no event is executed, None if not used
+	stopHeight: Height of the honest longest chain (blocks after genesis) at which simulation stops, None if not used
+	stopBlocks: Number of successfully mined blocks (honest and adversary) at which simulation stops, None if not used
+	wallTime: Wall clock budget in seconds, None if not used
+	honestHeight: Height of the longest chain seen by any honest node
+	cntBlocksMined: Number of successfully mined blocks so far
+	cntSuccessfulBlocks: Last seen count of successfully mined blocks for each miner, Structure = { NodeID : count, ... }
+	startWallTime: Wall clock time at which the event loop started
+	reason: Reason for stopping the simulation (None while running)
+
+	'''
+	# Wall clock is checked once every these many events
+	wallTimeCheckInterval = 1024
+
+	def __init__(self, maxEventLoop, stopTime=None, stopHeight=None, stopBlocks=None, wallTime=None):
+		self.maxEventLoop = maxEventLoop
+		self.stopTime = stopTime
+		self.stopHeight = stopHeight
+		self.stopBlocks = stopBlocks
+		self.wallTime = wallTime
+		self.honestHeight = 0
+		self.cntBlocksMined = 0
+		self.cntSuccessfulBlocks = dict()
+		self.startWallTime = time.time()
+		self.reason = None
+
+	# Restart the wall clock budget (called when the event loop starts)
+	def start(self):
+		self.startWallTime = time.time()
+
+	# Chain statistics to be stored in a checkpoint
+	def statistics(self):
+		return { "honestHeight": self.honestHeight, "cntBlocksMined": self.cntBlocksMined, "cntSuccessfulBlocks": dict(self.cntSuccessfulBlocks) }
+
+	# Restore chain statistics from a checkpoint
+	def restore(self, statistics):
+		self.honestHeight = statistics["honestHeight"]
+		self.cntBlocksMined = statistics["cntBlocksMined"]
+		self.cntSuccessfulBlocks = dict(statistics["cntSuccessfulBlocks"])
+
+	# Check the stop conditions before executing the next event, cnt is the number of events executed so far
+	def reached(self, cnt, eventQueue):
+		if cnt >= self.maxEventLoop:
+			self.reason = "executed maxEventLoop (" + str(self.maxEventLoop) + ") events"
+
+		elif len(eventQueue) == 0:
+			self.reason = "event queue is empty"
+
+		elif self.stopTime is not None and eventQueue.peek().timestamp > self.stopTime:
+			self.reason = "reached simulated time " + str(self.stopTime) + " milliseconds"
+
+		elif self.stopHeight is not None and self.honestHeight >= self.stopHeight:
+			self.reason = "honest longest chain reached height " + str(self.stopHeight)
+
+		elif self.stopBlocks is not None and self.cntBlocksMined >= self.stopBlocks:
+			self.reason = "mined " + str(self.stopBlocks) + " blocks"
+
+		elif self.wallTime is not None and cnt % self.wallTimeCheckInterval == 0 and time.time() - self.startWallTime >= self.wallTime:
+			self.reason = "wall clock budget of " + str(self.wallTime) + " seconds is over"
+
+		return self.reason is not None
+
+	# Update the chain statistics after an event is executed
+	def update(self, event, nodeArray):
+		if event.executedBy is None or event.eventType[1] != "block":
+			return
+
+		node = nodeArray[event.executedBy]
+
+		# Block accepted by an honest node (mined or received)
+		if node.role == "honest" and event.eventType[0] in ("receive", "broadcast"):
+			block = event.eventObject
+			if block.depth > self.honestHeight and block.blockHash in node.blocksSeen:
+				self.honestHeight = block.depth
+
+		# Mining finished, counting the successful ones
+		if event.eventType[0] in ("broadcast", "finished"):
+			self.cntBlocksMined += node.cntSuccessfulBlocks - self.cntSuccessfulBlocks.get(node.nodeID, 0)
+			self.cntSuccessfulBlocks[node.nodeID] = node.cntSuccessfulBlocks
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+from multiprocessing import Pool
+from utils import parseArguments
+from simulator import SimulationConfig, Simulator
+import contextlib
+import itertools
+import io
+import csv
+import sys
+import os
+
+'''
+Parameter sweep over the simulation arguments, every point of the grid is simulated in a worker process (see simulator.py)
+
+Usage : python3 sweep.py --nodes=10,20 --zeta_1=0.1,0.3 --zeta_2=0.1 --T_Tx=1000 --I=600 --maxEventLoop=100000 [--name=values ...]
+	--nodes, --zeta_1, --zeta_2, --T_Tx, --I, --maxEventLoop: Comma separated values of the main.py arguments
+	--seeds: Comma separated seeds, every point is simulated once per seed (default 1)
+	--workers: Number of simulations run in parallel (default: number of CPUs)
+	--output: CSV file collecting one row per run (default sweep.csv), runs already in it with the same --options are skipped (resume)
+	--parquet: Also write the table to this Parquet file when the sweep ends (needs pandas)
+	--options: Extra main.py options given to every run, e.g. --options="--stopHeight=50 --scheduler=calendar"
+'''
+
+# Parameters of a run, they identify the rows of the output table
+gridParameters = ("nodes", "zeta_1", "zeta_2", "T_Tx", "I", "maxEventLoop", "seed")
+
+sweepArguments = {
+	'nodes'             : None,
+	'zeta_1'            : None,
+	'zeta_2'            : None,
+	'T_Tx'              : None,
+	'I'                 : None,
+	'maxEventLoop'      : None,
+	'seeds'             : '1',
+	'workers'           : None,
+	'output'            : 'sweep.csv',
+	'parquet'           : None,
+	'options'           : '',
+}
+
+# Parse the sweep arguments, None if they are incorrect
+def parse_sweep_arguments(argv):
+	arguments = dict(sweepArguments)
+
+	for argument in argv[1:]:
+		name, _, value = argument.lstrip("-").partition("=")
+		if not argument.startswith("--") or name not in arguments:
+			print("Unknown argument " + argument + ", available arguments: " + ", ".join("--" + name for name in arguments))
+			return None
+		arguments[name] = value
+
+	missing = [name for name in gridParameters[:-1] if arguments[name] is None]
+	if missing:
+		print("Missing values for: " + ", ".join("--" + name for name in missing))
+		print(__doc__)
+		return None
+
+	return arguments
+
+# All the runs of the grid (cartesian product of the given values), as dictionaries of main.py argument strings
+def build_grid(arguments):
+	values = [arguments[name].split(",") for name in gridParameters[:-1]] + [arguments['seeds'].split(",")]
+	return [dict(zip(gridParameters, point)) for point in itertools.product(*values)]
+
+# Key identifying a run in the output table (numbers are normalized so that "0.1" and ".1" are the same point, options are sorted
+# so that their order does not matter), runs of the same point with other --options are other runs
+def run_key(run, options):
+	return tuple(float(run[name]) for name in gridParameters) + (" ".join(sorted(options.split())),)
+
+# Keys of the runs already written in the output table
+def finished_runs(output):
+	if not os.path.exists(output):
+		return set()
+	with open(output, newline='') as f:
+		reader = csv.DictReader(f)
+		if reader.fieldnames is not None and "options" not in reader.fieldnames:
+			raise ValueError(output + " has no options column (written by an older sweep), use another --output!!!!")
+		return { run_key(row, row["options"]) for row in reader }
+
+# Configuration of a run without output (main.py arguments and options), None if they are incorrect (parseArguments prints why)
+def run_config(run, options):
+	inputs = parseArguments(["main.py"] + [run[name] for name in gridParameters[:-1]] + ["--seed=" + run['seed'], "--trace=off", "--noReport"] + options)
+	return None if inputs is None else SimulationConfig.from_arguments(inputs)
+
+# Snapshot (see Simulator.snapshot) continued by the runs of this worker process, None to simulate them from the genesis event
+warmStartSnapshot = None
+
+# Pool initializer giving the snapshot to the worker processes
+def set_warm_start(snapshot):
+	global warmStartSnapshot
+	warmStartSnapshot = snapshot
+
+# Simulate one run in the worker process and return its summary (None if the run failed)
+def simulate(task):
+	run, options = task
+
+	# Output of the simulation is not shown, parseArguments explains incorrect arguments in its last line
+	output = io.StringIO()
+	try:
+		with contextlib.redirect_stdout(output):
+			config = run_config(run, options)
+			if config is None:
+				return run, None, (output.getvalue().strip().splitlines() or ["incorrect arguments"])[-1]
+			summary = Simulator(config, warmStartSnapshot).run().summary()
+	except Exception as error:
+		return run, None, type(error).__name__ + ": " + str(error)
+
+	# Arguments are written as given on the command line
+	summary.update(run)
+	return run, summary, None
+
+# Run all the points of the grid not yet in the output table, writing every row as soon as its run ends
+def run_sweep(arguments):
+	grid = build_grid(arguments)
+	try:
+		finished = finished_runs(arguments['output'])
+	except ValueError as error:
+		print(str(error))
+		return
+	pending = [run for run in grid if run_key(run, arguments['options']) not in finished]
+	options = arguments['options'].split()
+	workers = int(arguments['workers']) if arguments['workers'] else os.cpu_count()
+
+	print(str(len(grid)) + " runs in the grid, " + str(len(grid) - len(pending)) + " already in " + arguments['output'] + ", running " + str(len(pending)) + " with " + str(workers) + " workers")
+
+	writer = None
+	cntFailed = 0
+	with open(arguments['output'], 'a', newline='') as f, Pool(workers) as pool:
+		header = f.tell() == 0
+
+		for cnt, (run, summary, error) in enumerate(pool.imap_unordered(simulate, [(run, options) for run in pending]), 1):
+			if summary is None:
+				cntFailed += 1
+				print("FAILED: " + " ".join(name + "=" + run[name] for name in gridParameters) + " : " + error, flush=True)
+				continue
+
+			# Columns are fixed by the first written row (of this or an earlier sweep)
+			if writer is None:
+				if header:
+					fieldnames = list(gridParameters) + ["options"] + [name for name in summary if name not in gridParameters]
+				else:
+					with open(arguments['output'], newline='') as existing:
+						fieldnames = next(csv.reader(existing))
+				writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+				if header:
+					writer.writeheader()
+
+			summary['options'] = " ".join(options)
+			writer.writerow(summary)
+			f.flush()
+			print("DONE (" + str(cnt) + "/" + str(len(pending)) + "): " + " ".join(name + "=" + run[name] for name in gridParameters) + ", MPU_node_overall=" + str(summary['MPU_node_overall']), flush=True)
+
+	if cntFailed:
+		print(str(cntFailed) + " runs failed, run the sweep again to retry them")
+
+	if arguments['parquet'] is not None:
+		write_parquet(arguments['output'], arguments['parquet'])
+
+# Convert the CSV table to Parquet
+def write_parquet(output, parquetFile):
+	try:
+		import pandas as pd
+	except ImportError:
+		print("pandas is needed to write Parquet files, the results are in " + output)
+		return
+
+	pd.read_csv(output).to_parquet(parquetFile, index=False)
+	print("Parquet table written to " + parquetFile)
+
+if __name__ == "__main__":
+	arguments = parse_sweep_arguments(sys.argv)
+
+	if arguments is None:
+		sys.exit()
+
+	run_sweep(arguments)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+from block import BlockSizes
+from simulator import Simulator
+import dataclasses
+import numpy as np
+import pytest
+
+'''
+Tests of the synthetic block sizes of the block only mode
+'''
+
+@pytest.mark.parametrize("distribution, kind, parameters", [("uniform:1:1000", "uniform", [1, 1000]), ("uniform:0:0", "uniform", [0, 0]),
+	("exponential:250", "exponential", [250]), ("fixed:0", "fixed", [0]), ("fixed:512.5", "fixed", [512.5])])
+def test_block_sizes_parse(distribution, kind, parameters):
+	sizes = BlockSizes(distribution, None)
+	assert (sizes.kind, sizes.parameters) == (kind, parameters)
+
+@pytest.mark.parametrize("distribution", ["uniform:10:1", "uniform:-1:5", "uniform:1", "exponential:0", "exponential:-3", "exponential:nan",
+	"fixed:-1", "fixed:nan", "fixed:big", "normal:5:1", "fixed"])
+def test_block_sizes_reject_incorrect_distributions(distribution):
+	with pytest.raises(ValueError):
+		BlockSizes(distribution, None)
+
+def test_block_sizes_draw_in_range():
+	rng = np.random.default_rng(1)
+	uniform = [BlockSizes("uniform:3:5", rng).draw() for _ in range(200)]
+	assert set(uniform) == { 3, 4, 5 }
+	assert all(BlockSizes("exponential:100", rng).draw() >= 0 for _ in range(200))
+	assert BlockSizes("fixed:7", rng).draw() == 7
+
+# Incorrect sizes are reported when the configuration is validated, and only matter in block only mode
+def test_block_size_validated_with_block_only(config):
+	with pytest.raises(ValueError):
+		Simulator(dataclasses.replace(config, blockOnly=True, blockSize="fixed:-1"))
+	Simulator(dataclasses.replace(config, blockSize="fixed:-1"))
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+from simulator import Simulator
+from metrics import MetricsCollector
+from records import count_blocks_in_chain
+import dataclasses
+import numpy as np
+import csv
+
+'''
+Tests of the time series of the chain metrics: samples at every interval, counters consistent with the final block trees
+'''
+
+def test_metrics_time_series(config, summary, tmp_path):
+	expected = Simulator(config).run()
+
+	metricsFile = str(tmp_path / "metrics.csv")
+	simulator = Simulator(dataclasses.replace(config, metricsFile=metricsFile, metricsInterval=2000))
+	result = simulator.run()
+	assert summary(result) == summary(expected)
+
+	with open(metricsFile, newline='') as f:
+		rows = list(csv.DictReader(f))
+	assert tuple(rows[0]) == MetricsCollector.columns
+	samples = simulator.metrics.to_array()
+	assert len(rows) == len(samples)
+	assert list(samples["time"]) == list(range(2000, result.simulatedTime + 1, 2000)) + ([result.simulatedTime] if result.simulatedTime % 2000 else [])
+
+	# Counters only grow, and the stale blocks are the published blocks out of the main chain
+	for column in ("publishedBlocks", "chainHeight", "reorgs", "adv1_stateZeroDashTime", "adv2_stateZeroDashTime"):
+		assert np.all(np.diff(samples[column]) >= 0), column
+	assert np.all(samples["staleBlocks"] == samples["publishedBlocks"] - samples["chainHeight"])
+	assert np.all(samples["reorgs"] == samples["reorgsDepth1"] + samples["reorgsDepth2"] + samples["reorgsDepth3plus"])
+
+	# The last sample is the state at the end of the run
+	last = samples[-1]
+	tip = simulator.metrics.tip
+	assert last["chainHeight"] == tip.depth == simulator.stopConditions.honestHeight
+	for adversary, node in enumerate(simulator.nodeArray[-2:], 1):
+		assert last["adv" + str(adversary) + "_mainChainShare"] == count_blocks_in_chain(tip, node.nodeID) / tip.depth
+		assert last["adv" + str(adversary) + "_privateLead"] == len(node.privateChain)
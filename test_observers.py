@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+from simulator import Simulator
+from observers import Observers
+import dataclasses
+import pytest
+
+'''
+Tests of the observer hooks: callbacks see every block mined and accepted, and observing does not change the run
+'''
+
+def test_observers_see_the_run(config, summary):
+	expected = Simulator(config).run()
+
+	simulator = Simulator(config)
+	payloads = { hook : [] for hook in Observers.hooks }
+	for hook in Observers.hooks:
+		simulator.observe(hook, payloads[hook].append)
+	result = simulator.run()
+
+	assert summary(result) == summary(expected)
+	assert all(payloads[hook] for hook in ("blockMined", "blockAccepted", "txnCreated", "attackState"))
+	assert len(payloads["blockMined"]) == simulator.stopConditions.cntBlocksMined
+	for hook, calls in payloads.items():
+		timestamps = [payload["timestamp"] for payload in calls]
+		assert timestamps == sorted(timestamps), hook
+
+	# Accepted blocks were mined before, by another node
+	mined = { payload["block"].blockHash : payload for payload in payloads["blockMined"] }
+	for payload in payloads["blockAccepted"]:
+		assert payload["block"].blockHash in mined
+		assert payload["nodeID"] != mined[payload["block"].blockHash]["nodeID"]
+	assert all(payload["depth"] >= 1 and simulator.nodeArray[payload["nodeID"]].role == "honest" for payload in payloads["reorg"])
+
+def test_observe_rejects_unknown_hooks(config):
+	with pytest.raises(ValueError):
+		Simulator(config).observe("blockFound", print)
+	with pytest.raises(ValueError):
+		Simulator(dataclasses.replace(config, blockOnly=True, parallel=2)).observe("blockMined", print)
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+from simulator import Simulator
+import dataclasses
+import pytest
+
+'''
+Tests of the parallel engine: same runs as the sequential engine up to stopTime, exactly maxEventLoop events otherwise
+'''
+
+def test_parallel_same_as_sequential(config, summary):
+	sequential = Simulator(dataclasses.replace(config, blockOnly=True)).run()
+	parallel = Simulator(dataclasses.replace(config, blockOnly=True, parallel=2)).run()
+	assert summary(parallel) == summary(sequential)
+	assert sequential.events > 0
+
+# The budget is checked inside the windows: the run stops after exactly maxEventLoop events, like the sequential engine
+@pytest.mark.parametrize("maxEventLoop", [7, 500])
+def test_parallel_stops_at_max_event_loop(config, maxEventLoop):
+	limited = dataclasses.replace(config, blockOnly=True, maxEventLoop=maxEventLoop)
+	sequential = Simulator(limited).run()
+	parallel = Simulator(dataclasses.replace(limited, parallel=3)).run()
+	assert parallel.events == sequential.events == maxEventLoop
+	assert parallel.stopReason == sequential.stopReason
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+from simulator import Simulator
+import dataclasses
+
+'''
+Tests of the wall time accounting: the statistics of a simulation must not change its outcome nor the other simulations
+'''
+
+# A simulation without statistics run in the middle of an event of one with statistics (from an observer) is not timed
+def test_event_stats_per_simulator(config, summary):
+	expected = Simulator(config).run()
+
+	timed = Simulator(dataclasses.replace(config, eventStats=True))
+	nested = []
+	def run_nested(payload):
+		if not nested:
+			nested.append(Simulator(config).run())
+	timed.observe("blockMined", run_nested)
+	result = timed.run()
+
+	assert summary(nested[0]) == summary(expected)
+	assert summary(result) == summary(expected)
+	assert timed.eventStats.events_executed() == result.events
+	assert result.eventStats["methods"]["Node.validate_block"]["count"] > 0
+	assert all(type(node).__name__ in ("Node", "AttackNode") for node in timed.nodeArray)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+from replicate import parse_replicate_arguments, t_quantile, confidence_interval, precise_enough, run_replications, compared_configuration, network_changes, paired_differences
+import pytest
+
+'''
+Tests of the Monte Carlo replications: quantiles of the Student t distribution, the stopping rule on the interval widths, warm starts
+and paired comparisons (common random numbers)
+'''
+
+# Quantiles from the tables of the Student t distribution
+@pytest.mark.parametrize("p, degreesOfFreedom, expected", [(0.975, 1, 12.7062), (0.95, 1, 6.3138), (0.975, 2, 4.3027), (0.95, 2, 2.9200),
+	(0.975, 3, 3.1824), (0.95, 3, 2.3534), (0.975, 10, 2.2281), (0.975, 30, 2.0423), (0.975, 1000, 1.9623)])
+def test_t_quantile(p, degreesOfFreedom, expected):
+	assert t_quantile(p, degreesOfFreedom) == pytest.approx(expected, abs=1e-4)
+	assert t_quantile(1 - p, degreesOfFreedom) == pytest.approx(-expected, abs=1e-4)
+
+def test_confidence_interval_leaves_out_undefined_values():
+	mean, halfWidth, count = confidence_interval([1.0, None, 3.0], 0.95)
+	assert (mean, count) == (2.0, 2)
+	assert halfWidth == pytest.approx(12.7062, abs=1e-4)
+	assert confidence_interval([None], 0.95)[2] == 0
+
+def test_precise_enough():
+	summaries = [{ "a": 0.5, "b": None }, { "a": 0.52, "b": None }, { "a": 0.51, "b": None }]
+	assert precise_enough(summaries, ["a", "b"], 0.05, 0.95)
+	assert not precise_enough(summaries, ["a"], 0.01, 0.95)
+
+# The first replications already give a wide enough interval: the stopping rule ends the run after minReplications
+def test_replications_stop_on_target_width(capsys):
+	arguments = parse_replicate_arguments(["replicate.py", "5", "0.3", "0.2", "800", "500", "300", "--seed=1", "--minReplications=3", "--maxReplications=20",
+		"--targetWidth=1", "--targetMetrics=MPU_node_overall", "--workers=2", "--blockOnly", "--stopTime=5000"])
+	replications = run_replications(arguments)
+
+	assert "Target precision reached after 3 replications" in capsys.readouterr().out
+	assert [summaries[0]['seed'] for summaries in replications] == ["1", "2", "3"]
+
+# Arguments of short replications (block only mode), with the given replication options
+def replicate_arguments(*options):
+	return parse_replicate_arguments(["replicate.py", "5", "0.3", "0.2", "800", "500", "300", "--seed=1", "--minReplications=2", "--maxReplications=2",
+		"--workers=2", "--blockOnly", "--stopTime=5000"] + list(options))
+
+def test_compared_configuration_overrides_options():
+	run, options = compared_configuration(replicate_arguments("--compare=zeta_1=0.25,--stopTime=8000"))
+	assert run["zeta_1"] == "0.25"
+	assert options[-1] == "--stopTime=8000"
+
+@pytest.mark.parametrize("compare, changes", [("zeta_1=0.25,--stopTime=8000", []), ("I=300", ["I"]), ("--scheduler=calendar", ["scheduler"]), ("--blockOnly=False", ["blockOnly"])])
+def test_network_changes(compare, changes):
+	assert network_changes(replicate_arguments("--compare=" + compare)) == changes
+
+def test_warm_start_rejects_network_changes(capsys):
+	with pytest.raises(SystemExit):
+		run_replications(replicate_arguments("--warmStart=2000", "--compare=I=300"))
+	assert "FAILED: --compare cannot change I with --warmStart" in capsys.readouterr().out
+
+# Both configurations of a replication continue the warm start with the seed of the replication: the same configuration
+# gives the same runs, and the paired differences of the metrics are zero
+def test_warm_start_compare_pairs_runs(capsys):
+	replications = run_replications(replicate_arguments("--warmStart=2000", "--compare=--warmup=0"))
+	assert "Warm start: " in capsys.readouterr().out
+	assert len(replications) == 2
+	assert [base['seed'] for base, _ in replications] == [compare['seed'] for _, compare in replications] == ["1", "2"]
+	for base, compare in replications:
+		assert dict(base, wallTime=None) == dict(compare, wallTime=None)
+		assert base['simulatedTime'] > 2000
+	assert all(value in (0, None) for differences in paired_differences(replications) for value in differences.values())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+from scheduler import HeapEventQueue, CalendarEventQueue
+from simulator import Simulator
+from event import Event
+import dataclasses
+import random
+import pytest
+
+'''
+Tests of the event queue backends: the calendar queue must dequeue the events in the same order as the heap
+'''
+
+# Random operations on a queue: events scheduled a few milliseconds after the current one (often at the same millisecond),
+# cancellations, peeks followed by events before the peeked one (parallel engine) and compactions; returns the dequeued events
+def dequeue_order(queue, seed):
+	rng = random.Random(seed)
+	currTime = 0
+	scheduled = []
+	dequeued = []
+	for _ in range(5000):
+		for _ in range(rng.randint(0, 3)):
+			scheduled.append(queue.schedule(Event(currTime + rng.choice((0, 1, 2, 10, 50, 1000)), rng.randint(0, 9), rng.randint(0, 9), len(scheduled), ("receive", "TXN"))))
+		if scheduled and rng.random() < 0.1:
+			queue.cancel(rng.choice(scheduled))
+		if rng.random() < 0.05 and queue.peek() is not None and queue.peek().timestamp > currTime + 1:
+			scheduled.append(queue.schedule(Event(currTime + 1, None, 0, len(scheduled), ("receive", "TXN"))))
+		if rng.random() < 0.01:
+			queue.compact()
+		event = queue.pop()
+		if event is not None:
+			assert event.timestamp >= currTime
+			currTime = event.timestamp
+			dequeued.append(event.eventObject)
+	return dequeued
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_calendar_queue_order_same_as_heap(seed):
+	assert dequeue_order(CalendarEventQueue(minCompactionSize=16), seed) == dequeue_order(HeapEventQueue(minCompactionSize=16), seed)
+
+@pytest.mark.parametrize("mining", ["node", "global"])
+def test_calendar_queue_same_as_heap(config, summary, mining):
+	heap = Simulator(dataclasses.replace(config, mining=mining, scheduler="heap")).run()
+	calendar = Simulator(dataclasses.replace(config, mining=mining, scheduler="calendar")).run()
+	assert summary(calendar) == summary(heap)
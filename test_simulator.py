@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+from simulator import Simulator, parse_flag
+import dataclasses
+import pytest
+
+'''
+Tests of the embeddable simulator: stepping, finishing, resuming and forking a simulation with its own seed must not change its outcome
+'''
+
+def test_step_same_as_run(config, summary):
+	expected = Simulator(config).run()
+
+	simulator = Simulator(config)
+	while simulator.step(997):
+		pass
+	assert simulator.finished
+	assert summary(simulator.finish()) == summary(expected)
+
+def test_finish_after_partial_step(config, capsys):
+	simulator = Simulator(dataclasses.replace(config, trace="summary"))
+	assert simulator.step(500) == 500
+
+	result = simulator.finish()
+	assert result.events == 500
+	assert result.stopReason == "finished by the caller after 500 events"
+	assert "stopped because finished by the caller after 500 events" in capsys.readouterr().out
+	assert simulator.step(10) == 0
+
+def test_resume_same_as_uninterrupted(config, summary, tmp_path):
+	checkpointFile = str(tmp_path / "checkpoint.gz")
+	uninterrupted = Simulator(dataclasses.replace(config, stopTime=None)).run()
+
+	Simulator(dataclasses.replace(config, stopTime=None, maxEventLoop=config.maxEventLoop // 2, checkpointFile=checkpointFile)).run()
+	resumed = Simulator(dataclasses.replace(config, stopTime=None, seed=None, resume=checkpointFile)).run()
+	assert summary(resumed) == summary(uninterrupted)
+
+def test_fork_same_seed_same_as_uninterrupted(config, summary):
+	uninterrupted = Simulator(config).run()
+
+	warm = Simulator(dataclasses.replace(config, stopTime=5000))
+	warm.step(config.maxEventLoop)
+	forked = Simulator(config, warm.snapshot()).run()
+	assert summary(forked) == summary(uninterrupted)
+
+def test_fork_rejects_network_changes(config):
+	warm = Simulator(dataclasses.replace(config, stopTime=5000))
+	warm.step(config.maxEventLoop)
+	snapshot = warm.snapshot()
+
+	forked = Simulator(dataclasses.replace(config, seed=4, zeta_1=0.25), snapshot).run()
+	assert forked.seed == 4
+	with pytest.raises(ValueError):
+		Simulator(dataclasses.replace(config, I=300), snapshot)
+
+# Pending POW completion of a node (scheduled or not), None if there is none
+def completion_of(node):
+	return node.futureBroadCastEvent if node.role == "honest" else (node.futureEvents[0] if node.futureEvents else None)
+
+# With the global mining engine a completion is only scheduled once the race has won it: a fork keeps it and draws the race again
+def test_fork_keeps_won_completion_with_global_mining(config):
+	config = dataclasses.replace(config, mining="global")
+	warm = Simulator(config)
+	won = []
+	while not won and warm.step(1):
+		won = [(node.nodeID, completion_of(node).timestamp) for node in warm.nodeArray if completion_of(node) is not None and completion_of(node).pending]
+	assert won
+
+	forked = Simulator(dataclasses.replace(config, seed=4, zeta_1=0.25), warm.snapshot())
+	assert [(nodeID, completion_of(forked.nodeArray[nodeID]).timestamp) for nodeID, _ in won] == won
+	assert all(completion_of(forked.nodeArray[nodeID]).pending for nodeID, _ in won)
+
+@pytest.mark.parametrize("value, expected", [(True, True), ("True", True), ("1", True), ("true", True), ("False", False), ("0", False), ("false", False)])
+def test_parse_flag(value, expected):
+	assert parse_flag(value) is expected
+
+def test_parse_flag_rejects_other_values():
+	with pytest.raises(ValueError):
+		parse_flag("yes")
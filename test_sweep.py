@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+from sweep import parse_sweep_arguments, build_grid, run_key, finished_runs, run_sweep
+import csv
+
+'''
+Tests of the parameter sweep: the runs already in the output table are skipped when the sweep is run again
+'''
+
+def test_run_key_normalizes_numbers_and_options():
+	run = { "nodes": "10", "zeta_1": "0.1", "zeta_2": ".2", "T_Tx": "800", "I": "500", "maxEventLoop": "1000", "seed": "1" }
+	same = dict(run, zeta_1=".1", zeta_2="0.2")
+	assert run_key(run, "--blockOnly  --stopTime=5000") == run_key(same, "--stopTime=5000 --blockOnly")
+	assert run_key(run, "--blockOnly") != run_key(run, "--stopTime=5000")
+
+def test_sweep_resume_skips_finished_runs(tmp_path, capsys):
+	output = str(tmp_path / "sweep.csv")
+	argv = ["sweep.py", "--nodes=5", "--zeta_1=0.3", "--zeta_2=0.2", "--T_Tx=800", "--I=500", "--maxEventLoop=300", "--seeds=1,2", "--workers=1", "--output=" + output]
+	run_sweep(parse_sweep_arguments(argv + ["--options=--blockOnly --stopTime=5000"]))
+	assert len(finished_runs(output)) == 2
+
+	# Same runs with the options in another order, then a new point of the grid
+	run_sweep(parse_sweep_arguments(argv + ["--options=--stopTime=5000 --blockOnly"]))
+	assert "2 already in " + output + ", running 0" in capsys.readouterr().out
+	arguments = parse_sweep_arguments(argv[:2] + ["--zeta_1=0.3,0.25"] + argv[3:] + ["--options=--stopTime=5000 --blockOnly"])
+	run_sweep(arguments)
+	assert "2 already in " + output + ", running 2" in capsys.readouterr().out
+
+	with open(output, newline='') as f:
+		rows = list(csv.DictReader(f))
+	assert len(rows) == 4
+	assert finished_runs(output) == { run_key(run, arguments['options']) for run in build_grid(arguments) }
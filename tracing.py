@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+import json
+import struct
+import time
+import numpy as np
+
+# Event types and outcomes are stored as small integer codes in binary trace files
+eventTypeCodes = {
+	("genesis",): 0,
+	("create", "TXN"): 1,
+	("receive", "TXN"): 2,
+	("create", "block"): 3,
+	("broadcast", "block"): 4,
+	("finished", "block"): 5,
+	("receive", "block"): 6,
+	("mining", "race"): 7,
+	("create", "TXNs"): 8,
+	("receive", "TXNs"): 9,
+}
+outcomeCodes = {
+	"Successful!": 0,
+	"Already Heard!": 1,
+	"Node busy!": 2,
+	"Failed! (Not Longest Chain)": 3,
+	"Failed! Invalid Block": 4,
+	"Failed! (Winner Not Mining)": 5,
+}
+
+# Layout of one binary trace record (little endian): event number, timestamp, executing node (-1 for genesis), event type code, outcome code
+binaryRecordFormat = struct.Struct("<qqiBB")
+binaryRecordType = np.dtype([("event", "<i8"), ("timestamp", "<i8"), ("node", "<i4"), ("eventType", "u1"), ("outcome", "u1")])
+
+# Read a binary trace file into a NumPy structured array
+def read_binary_trace(filename):
+	return np.fromfile(filename, dtype=binaryRecordType)
+
+# Trace sink of the simulation (terminal output, progress lines and trace file)
+class Tracer:
+	'''
+	level: Verbosity level, possible levels: {"off", "summary", "event"}
+		"off" --> nothing is printed during the event loop
+		"summary" --> periodic progress lines and a summary at the end
+		"event" --> every (sampled) event is printed as well
+	sampleEvery: Only one in sampleEvery events is traced (printed and written to trace file)
+	progressInterval: Seconds between two progress lines (printed at "summary" and "event" levels)
+	traceFile: Name of the trace file (None for no file), ".bin" files use the binary record layout, others are JSON lines
+	bufferSize: Number of records buffered before writing them to the trace file in one chunk
+	tracesEvents: Boolean value stating whether events need to be given to record() (the event loop skips the call otherwise)
+	buffer: Buffered records not yet written to the trace file
+	startWallTime: Wall clock time at which the event loop started
+	startCnt: Number of events executed before the event loop started (non zero when resuming from a checkpoint)
+	lastProgressTime: Wall clock time of the last progress line
+
+	'''
+	levels = ("off", "summary", "event")
+
+	# Progress is checked once every these many events (must be a power of 2)
+	progressCheckInterval = 4096
+
+	def __init__(self, level="event", sampleEvery=1, progressInterval=10, traceFile=None, bufferSize=65536):
+		if level not in self.levels:
+			raise ValueError("Unknown trace level " + str(level) + ", available levels: " + ", ".join(self.levels))
+
+		self.level = level
+		self.sampleEvery = max(1, sampleEvery)
+		self.progressInterval = progressInterval
+		self.traceFile = traceFile
+		self.bufferSize = bufferSize
+		self.printsEvents = (level == "event")
+		self.printsProgress = (level != "off")
+		self.isBinary = traceFile is not None and traceFile.endswith(".bin")
+		self.tracesEvents = self.printsEvents or traceFile is not None
+		self.buffer = []
+		self.file = None
+		self.startWallTime = time.time()
+		self.lastProgressTime = self.startWallTime
+		self.startCnt = 0
+
+	# Open the trace file and start the clock (called when the event loop starts), append to the trace file when resuming
+	def start(self, append=False, startCnt=0):
+		if self.traceFile is not None:
+			self.file = open(self.traceFile, ("a" if append else "w") + ("b" if self.isBinary else ""), buffering=1 << 20)
+		self.startWallTime = time.time()
+		self.lastProgressTime = self.startWallTime
+		self.startCnt = startCnt
+
+	# Trace an executed event, cnt is the number of events executed before it
+	def record(self, cnt, event, outcome, nodeArray):
+		if cnt % self.sampleEvery:
+			return
+
+		if self.printsEvents:
+			role = "honest" if event.executedBy is None else nodeArray[event.executedBy].role
+			if event.eventType[0] == "genesis":
+				print("EVENT: Timestamp: " + str(event.timestamp) + " milliseconds, Type: genesis block creation : " + outcome)
+			elif event.executedBy is None:
+				print("EVENT: Timestamp: " + str(event.timestamp) + " milliseconds, Type: " + event.eventType[0] + " " + event.eventType[1] + " in the network : " + outcome)
+			else:
+				print("EVENT: Timestamp: " + str(event.timestamp) + " milliseconds, Type: " + event.eventType[0] + " " + event.eventType[1] + (" at attack node " if role == "attack" else " at node ") + str(event.executedBy) + " : " + outcome)
+
+		if self.file is not None:
+			node = -1 if event.executedBy is None else event.executedBy
+			if self.isBinary:
+				self.buffer.append(binaryRecordFormat.pack(cnt, event.timestamp, node, eventTypeCodes[event.eventType], outcomeCodes[outcome]))
+			else:
+				self.buffer.append(json.dumps({ "event": cnt, "timestamp": event.timestamp, "type": " ".join(event.eventType), "node": node, "outcome": outcome }) + "\n")
+
+			if len(self.buffer) >= self.bufferSize:
+				self.flush()
+
+	# Print a progress line if progressInterval seconds passed since the last one
+	def progress(self, cnt, timestamp, stopConditions):
+		now = time.time()
+		if not self.printsProgress or now - self.lastProgressTime < self.progressInterval:
+			return
+		self.lastProgressTime = now
+
+		elapsed = now - self.startWallTime
+		rate = (cnt - self.startCnt) / elapsed if elapsed > 0 else 0.0
+
+		# Estimating remaining time from the event cap and, if given, from the simulated time to reach
+		remaining = [(stopConditions.maxEventLoop - cnt) / rate] if rate > 0 else []
+		if stopConditions.stopTime is not None and timestamp > 0:
+			remaining.append(elapsed * (stopConditions.stopTime - timestamp) / timestamp)
+		if stopConditions.wallTime is not None:
+			remaining.append(stopConditions.wallTime - (now - stopConditions.startWallTime))
+		eta = max(0.0, min(remaining)) if remaining else float("nan")
+
+		print("PROGRESS: " + str(cnt) + " events, simulated time " + str(timestamp) + " milliseconds, " + "{:.0f}".format(rate) + " events/sec, ETA " + "{:.0f}".format(eta) + " seconds", flush=True)
+
+	# Write buffered records to the trace file in one chunk
+	def flush(self):
+		if self.file is not None and self.buffer:
+			self.file.write((b"" if self.isBinary else "").join(self.buffer))
+		self.buffer = []
+
+	# Flush and close the trace file, print the summary of the event loop
+	def finish(self, cnt, timestamp, reason):
+		self.flush()
+		if self.file is not None:
+			self.file.close()
+			self.file = None
+
+		if self.printsProgress:
+			elapsed = time.time() - self.startWallTime
+			print("SUMMARY: " + str(cnt - self.startCnt) + " events in " + "{:.2f}".format(elapsed) + " seconds (" + "{:.0f}".format((cnt - self.startCnt) / elapsed if elapsed > 0 else 0.0) + " events/sec), " + str(cnt) + " events in total, simulated time " + str(timestamp) + " milliseconds, stopped because " + reason)
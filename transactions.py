@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-import secrets
 
 # Class for Transaction
 class TXN:
@@ -12,9 +11,10 @@ class TXN:
 	isCoinbase: Boolean value representing if it is a coinbase transaction
 	TXNString: String format of transaction
 	TXNsize: Size of Transaction (1 KB = (8 × 10^3 bits) = 8000 bits)
+	rng: Random number generator (numpy Generator) of the creator, used to generate the TXNID
 
 	'''
-	def __init__(self, creationTime, fromNode, toNode, amount, isCoinbase):
+	def __init__(self, creationTime, fromNode, toNode, amount, isCoinbase, rng):
 		self.creationTime = creationTime
 		self.fromNode = fromNode
 		self.toNode = toNode
@@ -23,7 +23,7 @@ class TXN:
 		self.TXNsize = 8000
 
 		# Generating TXNID
-		self.TXNID = secrets.token_hex(32)
+		self.TXNID = rng.bytes(32).hex()
 
 		if not self.isCoinbase:
 			self.TXNString = self.TXNID + ': ' + str(self.fromNode) + ' pays ' + str(self.toNode) + ' ' + str(self.amount) + ' coins'
@@ -1,30 +1,77 @@
 #!/usr/bin/env python3
 from collections import deque
-from numpy.random import uniform
-import random
+
+# Optional command line arguments (given as --name=value) and their default values
+optionalArguments = {
+    'scheduler'         : 'heap',
+    'stopTime'          : None,
+    'stopHeight'        : None,
+    'stopBlocks'        : None,
+    'wallTime'          : None,
+    'trace'             : 'event',
+    'traceSample'       : '1',
+    'progressInterval'  : '10',
+    'traceFile'         : None,
+    'checkpointFile'    : None,
+    'checkpointEvery'   : None,
+    'checkpointInterval': None,
+    'resume'            : None,
+    'seed'              : None,
+    'noReport'          : False,
+    'summaryFile'       : None,
+    'warmup'            : None,
+    'parallel'          : None,
+    'mining'            : 'node',
+    'blockOnly'         : False,
+    'blockSize'         : 'uniform:1:1000',
+    'txnBatch'          : None,
+    'txnPropagation'    : 'flood',
+    'resultsDirectory'  : './Results',
+    'metricsFile'       : None,
+    'metricsInterval'   : '10000',
+    'eventStats'        : False,
+    'eventStatsFile'    : None,
+    'profile'           : None,
+    'profileEvents'     : None,
+}
 
 # Parsing the command line arguments
 def parseArguments(inputs):
 
-    if len(inputs) != 7:
-        print("Usage : python3 main.py nodes zeta_1 zeta_2 T_Tx I maxEventLoop\n")
+    # Options start with "--", the rest are positional arguments
+    positionalInputs = [arg for arg in inputs if not arg.startswith('--')]
+    optionalInputs = [arg[2:] for arg in inputs if arg.startswith('--')]
+
+    if len(positionalInputs) != 7:
+        print("Usage : python3 main.py nodes zeta_1 zeta_2 T_Tx I maxEventLoop [--name=value ...]\n")
         return None
     else:
         required_input = {
-            'nodes'             : inputs[1],
-            'T_Tx'              : inputs[4],
-            'I'                 : inputs[5],
-            'zeta_1'            : inputs[2],
-            'zeta_2'            : inputs[3],
-        	'maxEventLoop'      : inputs[6],
+            'nodes'             : positionalInputs[1],
+            'T_Tx'              : positionalInputs[4],
+            'I'                 : positionalInputs[5],
+            'zeta_1'            : positionalInputs[2],
+            'zeta_2'            : positionalInputs[3],
+            'maxEventLoop'      : positionalInputs[6],
         }
+
+        required_input.update(optionalArguments)
+
+        for arg in optionalInputs:
+            # Options without a value are flags
+            name, hasValue, value = arg.partition('=')
+            if name not in optionalArguments:
+                print("Unknown option --" + name + ", available options: " + ", ".join("--" + option for option in optionalArguments) + "\n")
+                return None
+            required_input[name] = value if hasValue else True
+
         return required_input
 
-# Assign Edge between node i and node j
-def assign_edge(nodeArray, i, j):
+# Assign Edge between node i and node j, rng is the topology random number generator
+def assign_edge(nodeArray, i, j, rng):
 
 	# Setting propagation delay from a uniform distribution between 10ms and 500ms
-	propagation_delay = uniform(10, 500)
+	propagation_delay = rng.uniform(10, 500)
 
 	# Setting link speed for this edge in bits/millisecond = 1000 bits/second
 	# If one of them is slow, link speed = 5 Mbps = 5*10^6 bps = 5000 bits/millisecond
@@ -38,10 +85,10 @@ def assign_edge(nodeArray, i, j):
 	nodeArray[i].peers[j] = [ nodeArray[j], propagation_delay, link_speed ]
 	nodeArray[j].peers[i] = [ nodeArray[i], propagation_delay, link_speed ]
 
-# Create graph with each node having randomly connections to 3-6 other peers
-def create_graph(nodeArray):
+# Create graph with each node having randomly connections to 3-6 other peers, rng is the topology random number generator
+def create_graph(nodeArray, rng):
 	nodePeers = [[i, 0] for i in range(len(nodeArray))]
-	random.shuffle(nodePeers)
+	rng.shuffle(nodePeers)
 	
 	while(True):
 		# Every node has more than 3 peers
@@ -52,7 +99,7 @@ def create_graph(nodeArray):
 		max_remaining_peers = 6 - nodePeers[0][1]
 
 		# Now, randomly select the number of peers to be added
-		addPeers = random.randint(1, max_remaining_peers)
+		addPeers = int(rng.integers(1, max_remaining_peers + 1))
 		
 		i = 1
 		# Random Shuffle introduces randomness, even when looping sequentially
@@ -67,7 +114,7 @@ def create_graph(nodeArray):
 			if(nodePeers[i][1] < 6):
 				nodePeers[i][1] = nodePeers[i][1] + 1
 				nodePeers[0][1] = nodePeers[0][1] + 1
-				assign_edge(nodeArray, nodePeers[0][0], nodePeers[i][0])
+				assign_edge(nodeArray, nodePeers[0][0], nodePeers[i][0], rng)
 				addPeers -= 1
 			else:
 			# If equal to 6, then next following nodes will also have 6 peers (as sorted) 
@@ -77,7 +124,7 @@ def create_graph(nodeArray):
 
 		
 		# Sort nodes based on number of peers, random shuffle to ensure randomness
-		random.shuffle(nodePeers)
+		rng.shuffle(nodePeers)
 		nodePeers.sort(key=lambda node: node[1])
 
 # Checking if generated graph is connected